@@ -3,8 +3,12 @@
 # Modified for ModelForge - AI-Powered Blender Assistant
 
 import bpy
-import mathutils
+import numpy as np
 import json
+import fnmatch
+import hashlib
+import logging
+import math
 import threading
 import socket
 import time
@@ -13,10 +17,21 @@ import tempfile
 import traceback
 import os
 import shutil
+import subprocess
+import struct
 import zipfile
+import zlib
+import queue
+import selectors
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque, OrderedDict
 from bpy.props import StringProperty, IntProperty, BoolProperty, EnumProperty
 import io
+import base64
+import sys
 from contextlib import redirect_stdout, suppress
+from collections import namedtuple
 
 bl_info = {
     "name": "ModelForge Blender",
@@ -35,17 +50,1434 @@ RODIN_FREE_TRIAL_KEY = os.environ.get("RODIN_FREE_TRIAL_KEY", "")
 REQ_HEADERS = requests.utils.default_headers()
 REQ_HEADERS.update({"User-Agent": "modelforge-blender"})
 
+# Wire framing for the socket protocol. Legacy clients send bare JSON objects
+# and the server re-parses its buffer until it holds one valid document.
+# Framed clients opt in by sending a negotiate_protocol command first:
+#   ndjson -> one JSON document per line, terminated by "\n"
+#   length -> 4-byte big-endian payload length followed by the JSON payload
+FRAMING_LEGACY = "legacy"
+FRAMING_NDJSON = "ndjson"
+FRAMING_LENGTH = "length"
+FRAMINGS = (FRAMING_LEGACY, FRAMING_NDJSON, FRAMING_LENGTH)
+LENGTH_PREFIX = struct.Struct("!I")
+MAX_MESSAGE_BYTES = 10 * 1024 * 1024  # 10 MB safety limit per message
+
+# Streamed responses (length framing only). A command sent with "stream": true
+# is answered with a JSON header frame {"id", "stream": "begin"}, then raw
+# frames that together hold the UTF-8 response JSON, then a zero-length frame.
+# The response is serialized lazily on the I/O thread as the socket drains.
+STREAM_CHUNK_BYTES = 256 * 1024
+# Containers this close to the top of a streamed response are encoded item by
+# item; deeper ones (e.g. single object records) go to json.dumps whole
+STREAM_SPLIT_DEPTH = 3
+STREAM_BATCH_ITEMS = 256  # list items encoded per json.dumps call below that depth
+
+# Binary payloads. Handlers return BinaryPayload for raw bytes (screenshots,
+# exported files) and the command's "transfer" field picks how they travel:
+#   base64 - inline base64 string (default; works with every framing)
+#   binary - {"$binary": index, "size", "mime"} descriptor in the JSON; the raw
+#            bytes follow the response as one frame per descriptor, in index
+#            order (length framing only, otherwise falls back to base64)
+#   file   - bytes written to a local hand-off file and replaced by a
+#            {"$file": path, "size", "mime"} descriptor; for same-host clients,
+#            which delete the file once consumed
+TRANSFER_BASE64 = "base64"
+TRANSFER_BINARY = "binary"
+TRANSFER_FILE = "file"
+TRANSFERS = (TRANSFER_BASE64, TRANSFER_BINARY, TRANSFER_FILE)
+HANDOFF_DIR = os.path.join(tempfile.gettempdir(), "modelforge-handoff")
+HANDOFF_MAX_AGE = 3600  # seconds before unclaimed hand-off files are removed
+
+# Persistent Poly Haven download cache (size cap is a scene setting, in MB)
+ASSET_CACHE_DIR = os.path.join(
+    os.environ.get("MODELFORGE_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "modelforge"),
+    "polyhaven",
+)
+DEFAULT_ASSET_CACHE_MB = 2048
+ASSET_MANIFEST_TTL = 7 * 24 * 3600  # seconds before an asset's file list is re-checked online
+
+
+class BinaryPayload:
+    """Raw bytes inside a handler result, encoded per the command's transfer mode"""
+
+    __slots__ = ("data", "mime", "extension")
+
+    def __init__(self, data, mime="application/octet-stream", extension="bin"):
+        self.data = data
+        self.mime = mime
+        self.extension = extension
+
+
+def _image_mime(file_format):
+    file_format = file_format.lower()
+    if file_format in ("jpg", "jpeg"):
+        return "image/jpeg"
+    return f"image/{file_format}"
+
+
+PNG_COMPRESS_LEVEL = 3  # zlib level: screenshots favour encode speed over size
+
+
+def _downsample_pixels(pixels, max_size):
+    """Box-filter an (height, width, channels) uint8 image so its longest side fits max_size"""
+    height, width = pixels.shape[:2]
+    if max(width, height) <= max_size:
+        return pixels
+    scale = max_size / max(width, height)
+    new_width, new_height = max(1, int(width * scale)), max(1, int(height * scale))
+
+    # Average every source pixel that falls inside each destination pixel
+    row_edges = np.arange(new_height) * height // new_height
+    col_edges = np.arange(new_width) * width // new_width
+    rows = np.add.reduceat(pixels.astype(np.float32), row_edges, axis=0)
+    rows /= np.diff(np.append(row_edges, height))[:, None, None]
+    cells = np.add.reduceat(rows, col_edges, axis=1)
+    cells /= np.diff(np.append(col_edges, width))[None, :, None]
+    return np.clip(cells + 0.5, 0, 255).astype(np.uint8)
+
+
+def _encode_png(pixels):
+    """Encode an (height, width, 3|4) uint8 top-down image as PNG bytes in memory"""
+    height, width, channels = pixels.shape
+    # Each scanline is prefixed with filter type 0 (None)
+    raw = np.zeros((height, width * channels + 1), dtype=np.uint8)
+    raw[:, 1:] = pixels.reshape(height, width * channels)
+
+    def chunk(tag, data):
+        return (struct.pack("!I", len(data)) + tag + data
+                + struct.pack("!I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+    color_type = 6 if channels == 4 else 2
+    return b"".join((
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack("!IIBBBBB", width, height, 8, color_type, 0, 0, 0)),
+        chunk(b"IDAT", zlib.compress(raw.tobytes(), PNG_COMPRESS_LEVEL)),
+        chunk(b"IEND", b""),
+    ))
+
+
+def _write_handoff_file(payload):
+    os.makedirs(HANDOFF_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=f".{payload.extension}", dir=HANDOFF_DIR)
+    with os.fdopen(fd, "wb") as f:
+        f.write(payload.data)
+    return path
+
+
+def _purge_handoff_files(max_age=HANDOFF_MAX_AGE):
+    """Remove hand-off files that no client picked up"""
+    if not os.path.isdir(HANDOFF_DIR):
+        return
+    cutoff = time.time() - max_age
+    for entry in os.scandir(HANDOFF_DIR):
+        with suppress(OSError):
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+
+
+class _PayloadEncoder:
+    """json default= hook resolving the BinaryPayload values of one response.
+
+    Only called for objects json cannot serialize natively, so responses
+    without binary data pay nothing extra.
+    """
+
+    def __init__(self, transfer):
+        self.transfer = transfer
+        self.payloads = []
+
+    def __call__(self, obj):
+        if not isinstance(obj, BinaryPayload):
+            raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+        if self.transfer == TRANSFER_BINARY:
+            self.payloads.append(obj.data)
+            return {"$binary": len(self.payloads) - 1, "size": len(obj.data), "mime": obj.mime}
+        if self.transfer == TRANSFER_FILE:
+            return {"$file": _write_handoff_file(obj), "size": len(obj.data), "mime": obj.mime}
+        return base64.b64encode(obj.data).decode('ascii')
+
+    def binary_frames(self):
+        """Length prefix and data of each collected payload, without copying the data"""
+        for data in self.payloads:
+            yield LENGTH_PREFIX.pack(len(data))
+            yield data
+
+# Main-thread scheduling. One persistent timer drains the work queue and hands
+# control back to Blender's UI once a tick has used up its time budget.
+DEFAULT_TICK_BUDGET_MS = 8.0
+IDLE_POLL_INTERVAL = 0.01  # seconds between queue checks right after work
+# While a client is connected the poll stays this tight, so a request/reply loop
+# never waits on the timer. With no clients the interval doubles up to
+# IDLE_POLL_MAX instead of waking Blender 100 times a second.
+IDLE_POLL_MAX_CONNECTED = 0.02
+IDLE_POLL_MAX = 0.25
+
+# Socket I/O. One selector loop on a single background thread multiplexes the
+# listening socket and every client; clients beyond max_clients get a
+# "server busy" error. A client that stops mid-message is dropped after
+# PARTIAL_READ_TIMEOUT, and reading pauses while a client's unsent output
+# exceeds OUTBOX_HIGH_WATER (backpressure).
+DEFAULT_MAX_CLIENTS = 8
+DEFAULT_LISTEN_BACKLOG = 16
+RECV_CHUNK_BYTES = 65536
+PARTIAL_READ_TIMEOUT = 60.0
+OUTBOX_HIGH_WATER = 16 * 1024 * 1024
+OUTBOX_LOW_WATER = 4 * 1024 * 1024
+
+# Registry entry for a socket command. Scheduling features key off the flags:
+#   main_thread - handler touches bpy and must run inside the main-thread timer
+#   read_only   - handler does not modify the scene or the .blend data
+#   cacheable   - result depends only on the params and data that rarely changes;
+#                 successful results are replayed on the I/O thread for a while
+#   thread_safe - handler only reads server state or the settings snapshot and
+#                 returns quickly, so it is answered on the I/O thread directly
+#   heavy       - handler tends to create datablocks (imports, images, code runs);
+#                 its datablock growth is tracked, and unless it is read_only
+#                 orphans may be purged afterwards
+CommandSpec = namedtuple(
+    "CommandSpec",
+    ["handler", "main_thread", "read_only", "cacheable", "thread_safe", "heavy"],
+    defaults=(True, False, False, False, False),
+)
+CACHED_RESULT_TTL = 30.0  # seconds a cacheable command's result is replayed
+
+# Commands may carry "timeout" (seconds from receipt). Queued commands that
+# miss it are dropped; execute_code is interrupted at its next Python line.
+# Python 3.10 and 3.11 report no line event for a jump back to the same line
+# (`while True: pass`), so interrupted frames get opcode events there too.
+TRACE_OPCODES = (3, 10) <= sys.version_info[:2] < (3, 12)
+
+STATS_WINDOW = 256  # latency samples kept per command type and metric
+
+# Optional parts of a get_all_object_info record, selectable via fields=[...]
+OBJECT_RECORD_FIELDS = (
+    "location", "rotation", "scale", "visible", "world_bounding_box",
+    "materials", "mesh", "modifiers", "light", "camera",
+)
+
+SCENE_DELTA_HISTORY = 10000  # removed-object records kept for get_scene_delta
+
+# bpy.data collections counted for memory accounting; all may hold orphans
+DATABLOCK_TYPES = (
+    "objects", "meshes", "materials", "images", "textures", "node_groups", "curves",
+    "armatures", "actions", "lights", "cameras", "worlds", "collections",
+)
+# Automatic purges only remove datablocks unused for this long, so a material
+# from download_polyhaven_asset survives until set_texture assigns it
+ORPHAN_GRACE_SECONDS = 120.0
+
+# execute_code: compiled snippets kept by source hash, and named global namespaces
+CODE_CACHE_SIZE = 256
+MAX_CODE_NAMESPACES = 32
+
+# execute_code(sandbox=True): code runs in `blender --background` on a copy of the file
+SANDBOX_TIMEOUT = 60.0       # default wall-clock limit, seconds
+SANDBOX_MAX_TIMEOUT = 600.0
+SANDBOX_POLL_INTERVAL = 0.05
+SANDBOX_LOG_TAIL = 4000      # characters of the sandbox's console output returned on failure
+
+# Background jobs (render, export, downloads)
+JOB_WORKERS = 4              # threads for network phases
+JOB_HISTORY = 100            # finished jobs kept for get_job_status / list_jobs
+JOB_PUSH_INTERVAL = 0.25     # minimum seconds between progress pushes per job
+DOWNLOAD_CHUNK_BYTES = 256 * 1024
+JOB_FINAL_STATES = ("completed", "failed", "cancelled")
+
+# Spatial index over world AABBs of objects with geometry
+SPATIAL_INDEX_TYPES = frozenset(("MESH", "CURVE", "SURFACE", "META", "FONT", "CURVES", "POINTCLOUD", "VOLUME"))
+SPATIAL_MIN_CELL_SIZE = 0.05
+SPATIAL_MAX_CELLS_PER_OBJECT = 512  # larger objects (floors, terrain) are checked on every query
+
+# Addon logging. Records below the configured level cost a single level check;
+# enabled records go to a ring buffer (fetched via get_server_logs) and to
+# Blender's console, which is synchronous and slow on Windows builds.
+LOG_LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+DEFAULT_LOG_LEVEL = "INFO"
+LOG_RING_SIZE = 500
+
+logger = logging.getLogger("modelforge")
+
+
+class _RingBufferHandler(logging.Handler):
+    """Keeps the most recent log records in memory for get_server_logs"""
+
+    def __init__(self, capacity=LOG_RING_SIZE):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.sequence = 0
+
+    def emit(self, record):
+        try:
+            message = record.getMessage()
+            if record.exc_info:
+                message += "\n" + "".join(traceback.format_exception(*record.exc_info)).rstrip()
+            with self.lock:
+                self.sequence += 1
+                self.records.append({
+                    "seq": self.sequence,
+                    "time": record.created,
+                    "level": record.levelname,
+                    "message": message,
+                })
+        except Exception:
+            self.handleError(record)
+
+    def fetch(self, since_seq=0, min_level=logging.NOTSET, limit=200):
+        with self.lock:
+            records = [r for r in self.records if r["seq"] > since_seq]
+        records = [r for r in records if logging.getLevelName(r["level"]) >= min_level]
+        return records[-limit:] if limit else records
+
+
+def _configure_logging():
+    """Attach the ring buffer and console handlers once per interpreter session"""
+    ring = next((h for h in logger.handlers if isinstance(h, _RingBufferHandler)), None)
+    if ring is None:
+        # Drop handlers left behind by a previous version of the addon module
+        for handler in [h for h in logger.handlers if h.get_name() == "modelforge"]:
+            logger.removeHandler(handler)
+        ring = _RingBufferHandler()
+        ring.set_name("modelforge")
+        console = logging.StreamHandler(sys.stdout)
+        console.set_name("modelforge")
+        console.setFormatter(logging.Formatter("[ModelForge] %(levelname)s: %(message)s"))
+        logger.addHandler(ring)
+        logger.addHandler(console)
+        logger.propagate = False
+        logger.setLevel(DEFAULT_LOG_LEVEL)
+    return ring
+
+
+_log_ring = _configure_logging()
+
+
+class ProtocolError(Exception):
+    """Raised when a client violates the wire framing; the connection is dropped."""
+
+
+def _command_shape_error(command):
+    """Why a command object can't be dispatched, or None"""
+    if not isinstance(command.get("type"), str):
+        return "Message needs a string 'type'"
+    if "params" in command and not isinstance(command["params"], dict):
+        return "'params' must be a JSON object"
+    return None
+
+
+class _ClientSession:
+    """Per-connection state: socket, framing mode, receive buffer and outbox.
+
+    Only the I/O thread touches the socket. Other threads queue encoded
+    responses with send_bytes(), which wakes the I/O loop via on_output.
+    """
+
+    def __init__(self, client, address=None, on_output=None):
+        self.client = client
+        self.address = address
+        self.framing = FRAMING_LEGACY
+        self.stream_by_default = False
+        self.buffer = bytearray()
+        self.scan_offset = 0  # ndjson: bytes already searched for a newline
+        self.send_lock = threading.Lock()
+        self.outbox = deque()
+        self.outbox_bytes = 0
+        self.on_output = on_output
+        self.closed = False
+        self.events = 0  # selector interest currently registered
+        self.reading = True
+        self.last_recv = time.monotonic()
+        # Commands handed to the main thread and replied to; each counter has a single writer
+        self.scheduled = 0  # I/O thread
+        self.completed = 0  # main thread
+        # Cancel keys of this connection's queued commands (key -> count) and
+        # of those cancel() was called for; guarded by the server's _cancel_lock
+        self.pending_ids = {}
+        self.cancelled = set()
+
+    def receive(self, data):
+        """Append raw bytes from the socket to the receive buffer"""
+        self.buffer += data
+
+    def next_message(self):
+        """Pop the next complete message from the buffer.
+
+        Returns (command, error) or None when more data is needed. Framed
+        messages are parsed exactly once; a malformed framed message yields
+        an error for that message only, while the stream stays in sync.
+        """
+        if self.framing == FRAMING_NDJSON:
+            return self._next_ndjson()
+        if self.framing == FRAMING_LENGTH:
+            return self._next_length_prefixed()
+        return self._next_legacy()
+
+    def _next_legacy(self):
+        if not self.buffer:
+            return None
+        if len(self.buffer) > MAX_MESSAGE_BYTES:
+            raise ProtocolError(f"Buffer exceeded {MAX_MESSAGE_BYTES} bytes")
+        try:
+            command = json.loads(self.buffer.decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # Incomplete data, wait for more
+            return None
+        self.buffer.clear()
+        return self._validate(command)
+
+    def _next_ndjson(self):
+        while True:
+            newline = self.buffer.find(b'\n', self.scan_offset)
+            if newline < 0:
+                self.scan_offset = len(self.buffer)
+                if self.scan_offset > MAX_MESSAGE_BYTES:
+                    raise ProtocolError(f"Line exceeded {MAX_MESSAGE_BYTES} bytes")
+                return None
+            line = bytes(self.buffer[:newline])
+            del self.buffer[:newline + 1]
+            self.scan_offset = 0
+            if line.strip():
+                return self._decode(line)
+
+    def _next_length_prefixed(self):
+        header_size = LENGTH_PREFIX.size
+        if len(self.buffer) < header_size:
+            return None
+        (length,) = LENGTH_PREFIX.unpack_from(self.buffer)
+        if length > MAX_MESSAGE_BYTES:
+            raise ProtocolError(f"Frame of {length} bytes exceeds {MAX_MESSAGE_BYTES}")
+        if len(self.buffer) < header_size + length:
+            return None
+        payload = bytes(self.buffer[header_size:header_size + length])
+        del self.buffer[:header_size + length]
+        return self._decode(payload)
+
+    @staticmethod
+    def _decode(payload):
+        try:
+            command = json.loads(payload.decode('utf-8'))
+        except (json.JSONDecodeError, UnicodeDecodeError) as e:
+            return None, f"Invalid JSON message: {str(e)}"
+        return _ClientSession._validate(command)
+
+    @staticmethod
+    def _validate(command):
+        """(command, error) for a decoded message.
+
+        Only objects with a string "type" and, if given, object "params" are
+        dispatched; anything else gets an error reply that still echoes the id.
+        """
+        if not isinstance(command, dict):
+            return None, "Message must be a JSON object"
+        error = _command_shape_error(command)
+        if error:
+            return ({"id": command["id"]} if "id" in command else None), error
+        return command, None
+
+    def payload_encoder(self, transfer=TRANSFER_BASE64):
+        """Binary payload encoder for one response; binary needs length framing"""
+        if transfer not in TRANSFERS or (transfer == TRANSFER_BINARY and self.framing != FRAMING_LENGTH):
+            transfer = TRANSFER_BASE64
+        return _PayloadEncoder(transfer)
+
+    def encode(self, response, transfer=TRANSFER_BASE64):
+        """Serialize a response using the connection's framing.
+
+        Returns the list of byte chunks to send: the framed JSON followed by
+        any binary payload frames.
+        """
+        encoder = self.payload_encoder(transfer)
+        payload = json.dumps(response, default=encoder).encode('utf-8')
+        if self.framing == FRAMING_NDJSON:
+            return [payload + b'\n']
+        if self.framing == FRAMING_LENGTH:
+            return [LENGTH_PREFIX.pack(len(payload)) + payload, *encoder.binary_frames()]
+        return [payload]
+
+    def send(self, response):
+        """Send a response; safe to call from the main thread or socket thread"""
+        self.send_bytes(*self.encode(response))
+
+    def send_bytes(self, *chunks, on_sent=None):
+        """Queue already-encoded bytes; the I/O loop writes them in order.
+
+        Several chunks are queued atomically so frames never interleave.
+        on_sent is called on the I/O thread once the last chunk is written.
+        """
+        with self.send_lock:
+            if self.closed:
+                raise ConnectionError("Client connection is closed")
+            for data in chunks:
+                self.outbox.append(memoryview(data))
+                self.outbox_bytes += len(data)
+            if on_sent is not None:
+                self.outbox.append(on_sent)
+        if self.on_output:
+            self.on_output(self)
+
+    def send_stream(self, frames, on_sent=None):
+        """Queue an iterator of encoded frames, pulled only as the socket drains"""
+        with self.send_lock:
+            if self.closed:
+                raise ConnectionError("Client connection is closed")
+            self.outbox.append(frames)
+            if on_sent is not None:
+                self.outbox.append(on_sent)
+        if self.on_output:
+            self.on_output(self)
+
+    def flush(self):
+        """Write as much queued output as the socket accepts without blocking.
+
+        Returns True once the outbox is empty.
+        """
+        with self.send_lock:
+            while self.outbox:
+                chunk = self.outbox[0]
+                if callable(chunk):
+                    # Everything queued before this marker has been written
+                    self.outbox.popleft()
+                    chunk()
+                    continue
+                if not isinstance(chunk, memoryview):
+                    # Streamed response: materialize the next frame on demand
+                    frame = next(chunk, None)
+                    if frame is None:
+                        self.outbox.popleft()
+                        continue
+                    chunk = memoryview(frame)
+                    self.outbox.appendleft(chunk)
+                    self.outbox_bytes += len(chunk)
+                try:
+                    sent = self.client.send(chunk)
+                except (BlockingIOError, InterruptedError):
+                    return False
+                self.outbox_bytes -= sent
+                if sent < len(chunk):
+                    self.outbox[0] = chunk[sent:]
+                    return False
+                self.outbox.popleft()
+            return True
+
+    def close(self):
+        """Close the socket and discard unsent output"""
+        with self.send_lock:
+            self.closed = True
+            self.outbox.clear()
+            self.outbox_bytes = 0
+        with suppress(Exception):
+            self.client.shutdown(socket.SHUT_RDWR)
+        with suppress(Exception):
+            self.client.close()
+
+
+class _CommandStats:
+    """Rolling per-command latency samples with percentile summaries.
+
+    Metrics are recorded in seconds:
+      queue_wait - socket receive until the main-thread timer picks the command up
+      handler    - handler execution time
+      serialize  - JSON encoding of the response
+      send       - queuing the encoded response until the I/O thread has written
+                   its last byte to the socket (includes waiting behind earlier
+                   replies and, for streamed responses, their lazy encoding)
+    """
+
+    METRICS = ("queue_wait", "handler", "serialize", "send")
+
+    def __init__(self, window=STATS_WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.samples = {}  # cmd_type -> {metric: deque of seconds}
+            self.calls = {}
+            self.errors = {}
+            self.dropped = {}
+            self.datablocks = {}  # cmd_type -> datablocks added
+            self.started_at = time.time()
+
+    def observe(self, cmd_type, metric, seconds):
+        with self.lock:
+            per_type = self.samples.get(cmd_type)
+            if per_type is None:
+                per_type = self.samples[cmd_type] = {
+                    m: deque(maxlen=self.window) for m in self.METRICS
+                }
+            per_type[metric].append(seconds)
+
+    def count(self, cmd_type, failed=False):
+        with self.lock:
+            self.calls[cmd_type] = self.calls.get(cmd_type, 0) + 1
+            if failed:
+                self.errors[cmd_type] = self.errors.get(cmd_type, 0) + 1
+
+    def account(self, cmd_type, datablocks_added):
+        with self.lock:
+            self.datablocks[cmd_type] = self.datablocks.get(cmd_type, 0) + datablocks_added
+
+    def drop(self, cmd_type):
+        with self.lock:
+            self.dropped[cmd_type] = self.dropped.get(cmd_type, 0) + 1
+
+    @staticmethod
+    def _percentile(ordered, fraction):
+        # Nearest-rank percentile over an already sorted list
+        index = min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))
+        return ordered[index]
+
+    def summary(self):
+        """Per command type: call/error counts and p50/p95/p99 in milliseconds"""
+        with self.lock:
+            snapshot = {
+                cmd_type: {metric: list(values) for metric, values in per_type.items()}
+                for cmd_type, per_type in self.samples.items()
+            }
+            calls = dict(self.calls)
+            errors = dict(self.errors)
+            dropped = dict(self.dropped)
+            datablocks = dict(self.datablocks)
+
+        commands = {}
+        for cmd_type in set(snapshot) | set(calls) | set(dropped):
+            entry = {"calls": calls.get(cmd_type, 0), "errors": errors.get(cmd_type, 0)}
+            if cmd_type in dropped:
+                entry["dropped"] = dropped[cmd_type]
+            if cmd_type in datablocks:
+                entry["datablocks_added"] = datablocks[cmd_type]
+            for metric, values in snapshot.get(cmd_type, {}).items():
+                if not values:
+                    continue
+                ordered = sorted(values)
+                entry[metric] = {
+                    "p50_ms": round(self._percentile(ordered, 0.50) * 1000, 3),
+                    "p95_ms": round(self._percentile(ordered, 0.95) * 1000, 3),
+                    "p99_ms": round(self._percentile(ordered, 0.99) * 1000, 3),
+                    "samples": len(ordered),
+                }
+            commands[cmd_type] = entry
+        return commands
+
+
+class _SceneChangeTracker:
+    """Object-level change log for one scene, fed by depsgraph_update_post.
+
+    Each notification that touches objects bumps `version` and stamps the
+    touched object pointers with it, so a delta since any version costs a
+    pass over changed objects rather than over the scene. Pointers identify
+    objects across renames. Undo and file loads reallocate datablocks, so
+    they reset the log and clients resync from a full snapshot. Frame
+    changes don't go through the depsgraph handler; frame_change_post
+    stamps the objects that can move with the frame instead.
+
+    The tracker also owns the per-object info record cache: an entry lives
+    until the depsgraph reports its object as updated, or a frame change
+    stamps it.
+    """
+
+    def __init__(self, history=SCENE_DELTA_HISTORY):
+        self.history = history
+        self.version = 0
+        # Set when a command may have edited data the depsgraph hasn't evaluated yet
+        self.pending = False
+        self.reset()
+
+    def reset(self, scene=None):
+        self.version += 1
+        # Versions before the last reset (or an evicted removal) can't be answered
+        self.floor = self.version
+        self.scene_pointer = scene.as_pointer() if scene is not None else None
+        self.objects = {}   # pointer -> Object currently in the scene
+        self.names = {}     # pointer -> name when last seen
+        self.added = {}     # pointer -> version the object appeared at
+        self.changed = {}   # pointer -> version the object last changed at
+        self.removed = OrderedDict()  # pointer -> (name, version), oldest first
+        self.records = {}   # pointer -> {record kind: cached info dict}
+        self.animated = None  # Objects that can change with the frame; None until needed
+        if scene is not None:
+            self._sync_membership(scene, baseline=True)
+
+    def on_depsgraph_update(self, scene, depsgraph):
+        if scene.as_pointer() != self.scene_pointer:
+            return
+        self.pending = False
+        touched = []
+        membership = False
+        for update in depsgraph.updates:
+            id_data = update.id
+            if isinstance(id_data, bpy.types.Object):
+                touched.append(id_data.original)
+            elif isinstance(id_data, bpy.types.Collection):
+                # Linking or unlinking objects tags the collection's geometry;
+                # other collection edits (visibility, renames) don't
+                membership = membership or update.is_updated_geometry
+            elif isinstance(id_data, bpy.types.Scene):
+                # Scene updates are frequent; resync only if the object count moved
+                membership = membership or len(scene.objects) != len(self.objects)
+            elif isinstance(id_data, bpy.types.Material):
+                # Records list material names, and a rename doesn't touch the objects
+                self.records.clear()
+            elif isinstance(id_data, bpy.types.Action):
+                self.animated = None
+        if touched:
+            # An edited object may have gained keyframes, drivers or constraints
+            self.animated = None
+        if touched or membership:
+            self.record(scene, touched, membership)
+
+    def on_frame_change(self, scene):
+        if scene.as_pointer() != self.scene_pointer:
+            return
+        if self.animated is None:
+            self.animated = [obj for obj in self.objects.values() if self._moves_with_frame(obj)]
+        if self.animated:
+            self.record(scene, self.animated)
+
+    @staticmethod
+    def _moves_with_frame(obj):
+        """Animated, driven or constrained, itself or through a parent.
+
+        Time-dependent modifiers and geometry nodes aren't detected.
+        """
+        while obj is not None:
+            if obj.animation_data is not None or obj.constraints:
+                return True
+            data = obj.data
+            if data is not None:
+                keys = getattr(data, "shape_keys", None)
+                if (getattr(data, "animation_data", None) is not None
+                        or (keys is not None and keys.animation_data is not None)):
+                    return True
+            obj = obj.parent
+        return False
+
+    def record(self, scene, objects=(), membership=False):
+        """Stamp objects (and, optionally, scene membership changes) with a new version"""
+        self.version += 1
+        if membership:
+            self._sync_membership(scene)
+        for obj in objects:
+            pointer = obj.as_pointer()
+            self.records.pop(pointer, None)
+            if pointer in self.objects:
+                self.changed[pointer] = self.version
+                self.names[pointer] = obj.name
+
+    def _sync_membership(self, scene, baseline=False):
+        self.animated = None
+        current = {obj.as_pointer(): obj for obj in scene.objects}
+        for pointer in self.objects.keys() - current.keys():
+            self._record_removed(pointer)
+        for pointer in current.keys() - self.objects.keys():
+            self.names[pointer] = current[pointer].name
+            if not baseline:
+                self.added[pointer] = self.version
+        self.objects = current
+
+    def _record_removed(self, pointer):
+        self.removed[pointer] = (self.names.pop(pointer, None), self.version)
+        self.removed.move_to_end(pointer)
+        self.added.pop(pointer, None)
+        self.changed.pop(pointer, None)
+        self.records.pop(pointer, None)
+        while len(self.removed) > self.history:
+            _, (_, version) = self.removed.popitem(last=False)
+            self.floor = max(self.floor, version)
+
+    def has_record(self, obj, kind):
+        return kind in self.records.get(obj.as_pointer(), ())
+
+    def cached_record(self, obj, kind, build):
+        """Return a copy of the cached `kind` record for obj, building it on a miss.
+
+        The copy is shallow, so callers may add or drop keys but must not
+        mutate nested lists.
+        """
+        pointer = obj.as_pointer()
+        if pointer not in self.objects:
+            # Not in the tracked scene, so nothing would invalidate an entry
+            return build(obj)
+        per_object = self.records.setdefault(pointer, {})
+        record = per_object.get(kind)
+        if record is None:
+            record = per_object[kind] = build(obj)
+        return dict(record)
+
+    def can_answer(self, since_version):
+        return since_version is not None and self.floor <= since_version <= self.version
+
+    def delta(self, since_version):
+        """Objects added, changed and removed after since_version.
+
+        A freed pointer may be reused by a new object, so clients should apply
+        removals before additions.
+        """
+        added = [self.objects[p] for p, v in self.added.items() if v > since_version]
+        added_pointers = {obj.as_pointer() for obj in added}
+        changed = [
+            self.objects[p] for p, v in self.changed.items()
+            if v > since_version and p not in added_pointers
+        ]
+        removed = [
+            {"id": str(p), "name": name}
+            for p, (name, v) in self.removed.items() if v > since_version
+        ]
+        return added, changed, removed
+
+
+class _SpatialIndex:
+    """Uniform grid over object world AABBs for box, nearest and overlap queries.
+
+    The index remembers the scene tracker version it was last synced to and
+    catches up from the tracker's delta, so only objects the depsgraph
+    reported since the previous query are re-bounded and re-bucketed. A
+    tracker reset (undo, file load) forces a full rebuild, which also
+    re-derives the cell size from the median object extent.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.cell_size = 1.0
+        self.objects = {}       # pointer -> Object
+        self.bounds = {}        # pointer -> (min xyz tuple, max xyz tuple)
+        self.cells = {}         # (i, j, k) -> set of pointers
+        self.object_cells = {}  # pointer -> cells the object is bucketed in
+        self.oversized = set()  # pointers spanning too many cells to bucket
+
+    def sync(self, tracker, compute_bounds):
+        """Bring the index up to tracker.version; compute_bounds is _get_aabbs"""
+        if self.version is not None and self.version == tracker.version:
+            return
+        if self.version is None or not tracker.can_answer(self.version):
+            self._rebuild(list(tracker.objects.values()), compute_bounds)
+        else:
+            added, changed, removed = tracker.delta(self.version)
+            for entry in removed:
+                self._remove(int(entry["id"]))
+            self._insert_many(added + changed, compute_bounds)
+        self.version = tracker.version
+
+    def _rebuild(self, objects, compute_bounds):
+        self.objects.clear()
+        self.bounds.clear()
+        self.cells.clear()
+        self.object_cells.clear()
+        self.oversized.clear()
+        objects = [obj for obj in objects if obj.type in SPATIAL_INDEX_TYPES]
+        bounds = compute_bounds(objects)
+        if bounds:
+            extents = np.asarray(bounds)
+            extents = (extents[:, 1] - extents[:, 0]).max(axis=1)
+            self.cell_size = max(float(np.median(extents)), SPATIAL_MIN_CELL_SIZE)
+        for obj, (lo, hi) in zip(objects, bounds):
+            self._insert(obj, lo, hi)
+
+    def _insert_many(self, objects, compute_bounds):
+        objects = [obj for obj in objects if obj.type in SPATIAL_INDEX_TYPES]
+        for obj, (lo, hi) in zip(objects, compute_bounds(objects)):
+            self._remove(obj.as_pointer())
+            self._insert(obj, lo, hi)
+
+    def _cell_range(self, lo, hi):
+        size = self.cell_size
+        first = tuple(math.floor(v / size) for v in lo)
+        last = tuple(math.floor(v / size) for v in hi)
+        count = 1
+        for a, b in zip(first, last):
+            count *= b - a + 1
+        return first, last, count
+
+    @staticmethod
+    def _iter_cells(first, last):
+        for i in range(first[0], last[0] + 1):
+            for j in range(first[1], last[1] + 1):
+                for k in range(first[2], last[2] + 1):
+                    yield (i, j, k)
+
+    def _insert(self, obj, lo, hi):
+        pointer = obj.as_pointer()
+        self.objects[pointer] = obj
+        self.bounds[pointer] = (tuple(lo), tuple(hi))
+        first, last, count = self._cell_range(lo, hi)
+        if count > SPATIAL_MAX_CELLS_PER_OBJECT:
+            self.oversized.add(pointer)
+            return
+        cells = list(self._iter_cells(first, last))
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(pointer)
+        self.object_cells[pointer] = cells
+
+    def _remove(self, pointer):
+        self.objects.pop(pointer, None)
+        self.bounds.pop(pointer, None)
+        self.oversized.discard(pointer)
+        for cell in self.object_cells.pop(pointer, ()):
+            bucket = self.cells.get(cell)
+            if bucket is not None:
+                bucket.discard(pointer)
+                if not bucket:
+                    del self.cells[cell]
+
+    def candidates(self, lo, hi):
+        """Pointers whose cells intersect the box (a superset of the true hits)"""
+        first, last, count = self._cell_range(lo, hi)
+        if count > len(self.cells):
+            # Box covers more cells than are occupied; walk the occupied ones instead
+            found = set()
+            for cell, bucket in self.cells.items():
+                if all(a <= c <= b for a, c, b in zip(first, cell, last)):
+                    found |= bucket
+        else:
+            found = set()
+            for cell in self._iter_cells(first, last):
+                bucket = self.cells.get(cell)
+                if bucket:
+                    found |= bucket
+        return found | self.oversized
+
+    def query_box(self, lo, hi, fully_inside=False):
+        hits = []
+        for pointer in self.candidates(lo, hi):
+            b_lo, b_hi = self.bounds[pointer]
+            if fully_inside:
+                inside = all(l <= a and b <= h for l, a, b, h in zip(lo, b_lo, b_hi, hi))
+            else:
+                inside = all(a <= h and l <= b for l, a, b, h in zip(lo, b_lo, b_hi, hi))
+            if inside:
+                hits.append(pointer)
+        return hits
+
+    def nearest(self, point, k):
+        """k pointers closest to point by AABB distance (0 inside the box), with distances"""
+        if not self.bounds:
+            return []
+        pointers = list(self.bounds)
+        boxes = np.array([self.bounds[p] for p in pointers])  # (n, 2, 3)
+        point = np.asarray(point, dtype=float)
+        gap = np.maximum(np.maximum(boxes[:, 0] - point, point - boxes[:, 1]), 0.0)
+        distances = np.sqrt((gap * gap).sum(axis=1))
+        k = min(k, len(pointers))
+        order = np.argpartition(distances, k - 1)[:k]
+        order = order[np.argsort(distances[order])]
+        return [(pointers[i], float(distances[i])) for i in order]
+
+    def overlaps(self, pointers=None, tolerance=0.0):
+        """Yield (a, b, overlap extents) for AABB pairs intersecting deeper than tolerance"""
+        sources = self.bounds.keys() if pointers is None else [p for p in pointers if p in self.bounds]
+        seen = set()
+        for a in sources:
+            a_lo, a_hi = self.bounds[a]
+            for b in self.candidates(a_lo, a_hi):
+                if b == a:
+                    continue
+                pair = (a, b) if a < b else (b, a)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                b_lo, b_hi = self.bounds[b]
+                extents = [min(ah, bh) - max(al, bl) for al, ah, bl, bh in zip(a_lo, a_hi, b_lo, b_hi)]
+                if all(e > tolerance for e in extents):
+                    yield pair[0], pair[1], extents
+
+
+class JobCancelled(Exception):
+    """Raised inside a job phase once cancellation has been requested"""
+
+
+class CommandInterrupted(BaseException):
+    """Raised by the execute_code trace hook on timeout or cancel().
+
+    A BaseException, so snippets' own `except Exception` blocks don't
+    swallow it; the hook is removed once it fires.
+    """
+
+
+# Returned by a main-thread phase whose completion is signalled later (renders)
+JOB_PENDING = object()
+
+
+class _Job:
+    """State of one background operation; read from any thread, written under the manager lock"""
+
+    def __init__(self, manager, job_id, kind, session=None, notify=False):
+        self.manager = manager
+        self.id = job_id
+        self.kind = kind
+        self.state = "queued"  # queued -> running -> importing -> completed | failed | cancelled
+        self.progress = None   # 0..1 when known
+        self.message = ""
+        self.result = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.session = session
+        self.notify = notify
+        self.last_push = 0.0
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def report(self, message=None, progress=None):
+        self.manager.report(self, message, progress)
+
+    def summary(self):
+        summary = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "progress": None if self.progress is None else round(self.progress, 3),
+            "message": self.message,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+        if self.state in JOB_FINAL_STATES:
+            summary["result"] = self.result
+        return summary
+
+
+class _JobManager:
+    """Runs long operations in two phases so neither Blender nor the server blocks.
+
+    A job's fetch phase (network I/O) runs on a worker thread and may report
+    progress and poll for cancellation. Its finish phase (the bpy import or
+    operator call) is queued for the main-thread timer, which runs at most
+    one per tick. Either phase returns a result dict; an in-band error ends
+    the job as failed.
+    """
+
+    def __init__(self, push):
+        self.push = push  # push(job): deliver a progress update to the job's client
+        self.lock = threading.Lock()
+        self.jobs = OrderedDict()
+        self.main_phases = queue.Queue()
+        self.executor = None
+        self.render_job = None
+        self._ids = itertools.count(1)
+
+    def start(self):
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="modelforge-job")
+
+    def shutdown(self):
+        with self.lock:
+            active = [job for job in self.jobs.values() if job.state not in JOB_FINAL_STATES]
+        for job in active:
+            job.cancel_event.set()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        while True:
+            try:
+                job, _, fetched = self.main_phases.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(fetched)
+            self.finish(job, "cancelled")
+
+    def submit(self, kind, fetch, finish, session=None, notify=False):
+        """Start a job: fetch(job) on a worker (or skipped when None), then finish(job, fetched)"""
+        job = _Job(self, f"job-{next(self._ids)}", kind, session, notify)
+        with self.lock:
+            self.jobs[job.id] = job
+            self._trim()
+        if fetch is None:
+            self.main_phases.put((job, finish, None))
+        else:
+            self.executor.submit(self._run_fetch, job, fetch, finish)
+        return job
+
+    def _trim(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.state in JOB_FINAL_STATES]
+        for job_id in finished[:max(0, len(finished) - JOB_HISTORY)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self):
+        with self.lock:
+            return list(self.jobs.values())
+
+    def report(self, job, message=None, progress=None, state=None):
+        with self.lock:
+            if state is not None:
+                job.state = state
+            if message is not None:
+                job.message = message
+            if progress is not None:
+                job.progress = progress
+            due = state is not None or time.monotonic() - job.last_push >= JOB_PUSH_INTERVAL
+            if due:
+                job.last_push = time.monotonic()
+        if due:
+            self.push(job)
+
+    def finish(self, job, state, result=None, message=None):
+        with self.lock:
+            if job.state in JOB_FINAL_STATES:
+                return
+            job.state = state
+            job.result = result
+            job.finished_at = time.time()
+            if state == "completed":
+                job.progress = 1.0
+            job.message = message or state.capitalize()
+        self.push(job)
+        job.session = None
+
+    @staticmethod
+    def _failed(result):
+        return isinstance(result, dict) and ("error" in result or result.get("succeed") is False)
+
+    @staticmethod
+    def _discard(fetched):
+        if isinstance(fetched, dict) and fetched.get("temp_dir"):
+            with suppress(Exception):
+                shutil.rmtree(fetched.pop("temp_dir"))
+
+    def _run_fetch(self, job, fetch, finish):
+        """Worker thread: network phase, then hand the result to the main thread"""
+        if job.cancel_event.is_set():
+            self.finish(job, "cancelled")
+            return
+        self.report(job, "Fetching", state="running")
+        try:
+            fetched = fetch(job)
+        except JobCancelled:
+            self.finish(job, "cancelled")
+            return
+        except Exception as e:
+            logger.exception("Job %s failed while fetching: %s", job.id, e)
+            self.finish(job, "failed", {"error": str(e)}, str(e))
+            return
+        if self._failed(fetched):
+            self._discard(fetched)
+            self.finish(job, "failed", fetched, "Fetch failed")
+            return
+        self.report(job, "Waiting for Blender", state="importing")
+        self.main_phases.put((job, finish, fetched))
+
+    def pending(self):
+        return not self.main_phases.empty()
+
+    def run_main_phase(self):
+        """Main-thread timer: run one queued finish phase; True if one ran"""
+        try:
+            job, finish, fetched = self.main_phases.get_nowait()
+        except queue.Empty:
+            return False
+        if job.cancel_event.is_set():
+            self._discard(fetched)
+            self.finish(job, "cancelled")
+            return False
+        self.report(job, "Running in Blender", state="importing")
+        try:
+            result = finish(job, fetched)
+        except JobCancelled:
+            self.finish(job, "cancelled")
+            return True
+        except Exception as e:
+            logger.exception("Job %s failed in Blender: %s", job.id, e)
+            self.finish(job, "failed", {"error": str(e)}, str(e))
+            return True
+        finally:
+            self._discard(fetched)
+        if result is not JOB_PENDING:
+            self.finish(job, "failed" if self._failed(result) else "completed", result)
+        return True
+
+    def await_render(self, job, result):
+        """Complete job with result once render_complete (or render_cancel) fires; None clears"""
+        with self.lock:
+            self.render_job = (job, result) if job is not None else None
+
+    def render_finished(self, cancelled=False):
+        with self.lock:
+            pending, self.render_job = self.render_job, None
+        if pending is None:
+            return
+        job, result = pending
+        if cancelled:
+            self.finish(job, "cancelled", message="Render cancelled")
+        else:
+            self.finish(job, "completed", result)
+
+
+def _download_file(url, path, job=None, headers=None, timeout=60):
+    """Stream url to path, reporting progress to job and honouring its cancellation.
+
+    Returns the HTTP status code; the file is only written for a 200.
+    """
+    with requests.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code != 200:
+            return response.status_code
+        total = int(response.headers.get("Content-Length") or 0)
+        name = os.path.basename(path)
+        done = 0
+        with open(path, "wb") as f:
+            for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_BYTES):
+                if job is not None:
+                    job.check_cancelled()
+                f.write(chunk)
+                done += len(chunk)
+                if job is not None:
+                    job.report(f"Downloading {name}", done / total if total else None)
+        return response.status_code
+
+
+class _AssetCache:
+    """Content-addressed file cache for downloaded assets.
+
+    Files are stored once under blobs/ by hash. A manifest per request
+    (asset, type, resolution, format) lists the blobs that make up the
+    asset, so a repeat request needs no network at all. Blob mtimes are the
+    LRU clock: every hit touches the blob, and eviction removes the oldest.
+    Used from job worker threads, hence the lock.
+    """
+
+    def __init__(self, root=ASSET_CACHE_DIR):
+        self.root = root
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _safe(part):
+        return "".join(c if c.isalnum() or c in "-_." else "_" for c in str(part))
+
+    def _blob_path(self, digest):
+        return os.path.join(self.root, "blobs", digest[:2], digest)
+
+    def _manifest_path(self, key):
+        return os.path.join(self.root, "manifests", "-".join(self._safe(part) for part in key) + ".json")
+
+    def load_manifest(self, key, max_age=ASSET_MANIFEST_TTL):
+        """Entries of a fresh manifest whose blobs are all present, else None"""
+        try:
+            with open(self._manifest_path(key), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - manifest.get("created", 0) > max_age:
+            return None
+        with self.lock:
+            if not all(os.path.exists(self._blob_path(entry["digest"])) for entry in manifest["entries"]):
+                return None
+        return manifest["entries"]
+
+    def save_manifest(self, key, entries):
+        path = self._manifest_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"created": time.time(), "entries": entries}, f)
+        os.replace(temp_path, path)
+
+    def materialize(self, digest, path):
+        """Place a cached blob at path (hard link, or copy across volumes); False on a miss"""
+        blob = self._blob_path(digest)
+        with self.lock:
+            if not os.path.exists(blob):
+                return False
+            os.utime(blob)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                os.link(blob, path)
+            except OSError:
+                shutil.copyfile(blob, path)
+        return True
+
+    def store(self, digest, path):
+        """Add a downloaded file to the cache under digest"""
+        blob = self._blob_path(digest)
+        temp_blob = f"{blob}.{threading.get_ident()}.tmp"
+        with self.lock:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            try:
+                os.link(path, temp_blob)
+            except OSError:
+                shutil.copyfile(path, temp_blob)
+            os.replace(temp_blob, blob)
+
+    def evict(self, max_bytes):
+        """Remove least recently used blobs until the cache fits max_bytes"""
+        blobs = []
+        with self.lock:
+            for directory, _dirs, names in os.walk(os.path.join(self.root, "blobs")):
+                for name in names:
+                    path = os.path.join(directory, name)
+                    with suppress(OSError):
+                        info = os.stat(path)
+                        blobs.append((info.st_mtime, info.st_size, path))
+            total = sum(size for _mtime, size, _path in blobs)
+            removed = 0
+            for _mtime, size, path in sorted(blobs):
+                if total <= max_bytes:
+                    break
+                with suppress(OSError):
+                    os.remove(path)
+                    total -= size
+                    removed += 1
+        return {"files": len(blobs) - removed, "bytes": total, "evicted": removed}
+
+    def clear(self):
+        with self.lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+
+
+def _file_md5(path):
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_BYTES), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+# Run inside the sandbox process: blender --background --factory-startup scene.blend --python runner.py -- code.py result.json
+SANDBOX_RUNNER = """\
+import io, json, sys, time, traceback
+from contextlib import redirect_stdout
+import bpy
+
+code_path, result_path = sys.argv[sys.argv.index("--") + 1:][:2]
+with open(code_path, encoding="utf-8") as f:
+    code = f.read()
+
+before = set(bpy.data.objects.keys())
+buffer = io.StringIO()
+result = {"executed": True}
+started = time.perf_counter()
+try:
+    with redirect_stdout(buffer):
+        exec(compile(code, "<sandbox>", "exec"), {"bpy": bpy})
+except Exception as e:
+    result = {"executed": False, "error": f"{type(e).__name__}: {e}",
+              "traceback": traceback.format_exc(limit=5)}
+after = set(bpy.data.objects.keys())
+result.update(
+    result=buffer.getvalue(),
+    duration_ms=round((time.perf_counter() - started) * 1000.0, 1),
+    added_objects=sorted(after - before),
+    removed_objects=sorted(before - after),
+    object_count=len(after),
+)
+with open(result_path, "w", encoding="utf-8") as f:
+    json.dump(result, f)
+"""
+
+
+def _run_sandbox(job, args, temp_dir, result_path, timeout):
+    """Worker thread: run a sandbox Blender and read its result.
+
+    The process is killed when it overruns timeout or the job is cancelled.
+    """
+    log_path = os.path.join(temp_dir, "blender.log")
+    started = time.monotonic()
+    try:
+        with open(log_path, "wb") as log:
+            process = subprocess.Popen(args, stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+            try:
+                while process.poll() is None:
+                    elapsed = time.monotonic() - started
+                    if elapsed > timeout:
+                        process.kill()
+                        process.wait()
+                        return {"error": f"Sandbox exceeded its {timeout:g}s limit and was killed",
+                                "timed_out": True, "temp_dir": temp_dir}
+                    if job is not None:
+                        job.check_cancelled()
+                        job.report("Sandbox running", min(elapsed / timeout, 0.99))
+                    time.sleep(SANDBOX_POLL_INTERVAL)
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
+    except BaseException:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+    try:
+        with open(result_path, encoding="utf-8") as f:
+            result = json.load(f)
+    except (OSError, ValueError):
+        with open(log_path, encoding="utf-8", errors="replace") as f:
+            log_tail = f.read()[-SANDBOX_LOG_TAIL:]
+        return {"error": f"Sandbox Blender exited with code {process.returncode} before reporting a result",
+                "log": log_tail, "temp_dir": temp_dir}
+    result["sandbox"] = True
+    result["wall_time_ms"] = round((time.monotonic() - started) * 1000.0, 1)
+    if not result["executed"]:
+        return {**result, "temp_dir": temp_dir}
+    return {"result": result, "temp_dir": temp_dir}
+
+
 class BlenderMCPServer:
-    def __init__(self, host='localhost', port=9876):
+    def __init__(self, host='localhost', port=9876, tick_budget_ms=DEFAULT_TICK_BUDGET_MS,
+                 max_clients=DEFAULT_MAX_CLIENTS, backlog=DEFAULT_LISTEN_BACKLOG):
         self.host = host
         self.port = port
         self.running = False
         self.socket = None
         self.server_thread = None
+        self.max_clients = max(1, int(max_clients))
+        self.backlog = max(1, int(backlog))
+        self.selector = None
+        self.sessions = set()
+        # Wakes the I/O loop from other threads (stop, queued output)
+        self._wakeup_recv = None
+        self._wakeup_send = None
+        self._write_requests = set()
+        self._write_requests_lock = threading.Lock()
+        # Commands from every connection, in arrival order:
+        # (session, command, error, received_at)
+        self.work_queue = queue.Queue()
+        self.tick_budget = tick_budget_ms / 1000.0
+        # Blender identifies timers by function object, so keep one bound method
+        self._drain_timer = self._drain_work_queue
+        self._idle_interval = IDLE_POLL_INTERVAL
+        # Command name -> CommandSpec, rebuilt only when integration toggles change
+        self.handlers = None
+        # Integration settings copied from the scene for thread_safe handlers
+        self.settings = {}
+        # (type, params json) -> (expires monotonic, response) for cacheable commands
+        self._cached_results = {}
+        self.stats = _CommandStats()
+        self.scene_tracker = _SceneChangeTracker()
+        self.jobs = _JobManager(self._push_job_update)
+        # Connection of the command the main thread is executing, for job progress pushes
+        self._current_session = None
+        # Id and perf_counter deadline of that command, for the execute_code trace hook
+        self._current_command_id = None
+        self._current_deadline = None
+        # Guards each session's pending_ids/cancelled; cancel() runs on the I/O thread
+        self._cancel_lock = threading.Lock()
+        # Connection a thread_safe command is answered for on the I/O thread
+        self._dispatch = threading.local()
+        # trace_lines of the running execute_code and the thread running it,
+        # so cancel() and the deadline timer can reach tight loops
+        self._line_trace = None
+        self._code_thread = None
+        self.spatial_index = _SpatialIndex()
+        self.asset_cache = _AssetCache()
+        # sha256 of execute_code source -> code object, least recently used first
+        self.code_cache = OrderedDict()
+        # Name -> globals dict kept across execute_code calls
+        self.code_namespaces = {}
+        # Open undo-checkpointed transaction: {"name", "started_at", "session"} or None
+        self.transaction = None
+        # Orphan pointer -> monotonic time first seen unused, for the purge grace period
+        self._orphans_seen = {}
+        # Datablock counts from the last heavy command, read by get_server_stats
+        # on the I/O thread; only get_data_stats pays for the byte estimate
+        self.data_stats = None
+        self.orphans_purged = 0
+        # Specs of the items run by the current batch(), accounted once at its end
+        self._batch_specs = None
 
     def start(self):
         if self.running:
-            print("Server is already running")
+            logger.info("Server is already running")
             return
 
         try:
@@ -53,33 +1485,49 @@ class BlenderMCPServer:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.socket.bind((self.host, self.port))
-            self.socket.listen(1)
+            self.socket.listen(self.backlog)
+            self.socket.setblocking(False)
+
+            self.selector = selectors.DefaultSelector()
+            self._wakeup_recv, self._wakeup_send = socket.socketpair()
+            self._wakeup_recv.setblocking(False)
+            self._wakeup_send.setblocking(False)
+            self.selector.register(self.socket, selectors.EVENT_READ, data="listener")
+            self.selector.register(self._wakeup_recv, selectors.EVENT_READ, data="wakeup")
 
             # Only set running after socket is successfully bound
             self.running = True
+            self.refresh_handlers()
+            self.scene_tracker.reset(bpy.context.scene)
+            self.jobs.start()
+            _purge_handoff_files()
+
+            # Single persistent main-thread timer that executes queued commands
+            if not bpy.app.timers.is_registered(self._drain_timer):
+                bpy.app.timers.register(self._drain_timer, first_interval=0.0, persistent=True)
 
             # Start server thread
-            self.server_thread = threading.Thread(target=self._server_loop)
+            self.server_thread = threading.Thread(target=self._server_loop, name="modelforge-io")
             self.server_thread.daemon = True
             self.server_thread.start()
 
-            print(f"BlenderMCP server started on {self.host}:{self.port}")
+            logger.info("BlenderMCP server started on %s:%s", self.host, self.port)
         except Exception as e:
-            print(f"Failed to start server: {str(e)}")
+            logger.error("Failed to start server: %s", e)
             self.stop()
 
     def stop(self):
         self.running = False
 
-        # Close socket
-        if self.socket:
-            try:
-                self.socket.close()
-            except:
-                pass
-            self.socket = None
+        if bpy.app.timers.is_registered(self._drain_timer):
+            bpy.app.timers.unregister(self._drain_timer)
+        # Drop commands that never reached the main thread
+        with self.work_queue.mutex:
+            self.work_queue.queue.clear()
+        self.jobs.shutdown()
 
-        # Wait for thread to finish
+        # Wake the I/O loop so it exits immediately, then wait for it
+        self._wakeup()
         if self.server_thread:
             try:
                 if self.server_thread.is_alive():
@@ -88,104 +1536,657 @@ class BlenderMCPServer:
                 pass
             self.server_thread = None
 
-        print("BlenderMCP server stopped")
+        # The loop closes its sockets on exit; this covers a failed start()
+        self._close_all()
+        logger.info("BlenderMCP server stopped")
 
-    def _server_loop(self):
-        """Main server loop in a separate thread"""
-        print("Server thread started")
-        self.socket.settimeout(1.0)  # Timeout to allow for stopping
-
-        while self.running:
-            try:
-                # Accept new connection
-                try:
-                    client, address = self.socket.accept()
-                    print(f"Connected to client: {address}")
-
-                    # Handle client in a separate thread
-                    client_thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(client,)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
-                except socket.timeout:
-                    # Just check running condition
-                    continue
-                except Exception as e:
-                    print(f"Error accepting connection: {str(e)}")
-                    time.sleep(0.5)
-            except Exception as e:
-                print(f"Error in server loop: {str(e)}")
-                if not self.running:
-                    break
-                time.sleep(0.5)
+    def _close_all(self):
+        for session in list(self.sessions):
+            session.close()
+        self.sessions.clear()
+        for sock in (self.socket, self._wakeup_recv, self._wakeup_send):
+            if sock:
+                with suppress(Exception):
+                    sock.close()
+        self.socket = self._wakeup_recv = self._wakeup_send = None
+        if self.selector:
+            with suppress(Exception):
+                self.selector.close()
+            self.selector = None
 
-        print("Server thread stopped")
+    def _wakeup(self):
+        if self._wakeup_send:
+            with suppress(Exception):
+                self._wakeup_send.send(b"\0")
 
-    def _handle_client(self, client):
-        """Handle connected client"""
-        print("Client handler started")
-        client.settimeout(None)  # No timeout
-        buffer = b''
-        MAX_BUFFER_BYTES = 10 * 1024 * 1024  # 10 MB safety limit
+    def _request_write(self, session):
+        """Called from any thread after output was queued on a session"""
+        with self._write_requests_lock:
+            self._write_requests.add(session)
+        self._wakeup()
 
+    def _server_loop(self):
+        """Selector loop multiplexing the listener and every client connection"""
+        logger.debug("Server thread started")
         try:
             while self.running:
-                # Receive data
                 try:
-                    data = client.recv(8192)
-                    if not data:
-                        print("Client disconnected")
+                    events = self.selector.select(timeout=1.0)
+                except (OSError, ValueError) as e:
+                    if not self.running:
                         break
+                    logger.warning("Error in server loop: %s", e)
+                    time.sleep(0.5)
+                    continue
 
-                    buffer += data
-                    if len(buffer) > MAX_BUFFER_BYTES:
-                        print(f"Buffer exceeded {MAX_BUFFER_BYTES} bytes, dropping connection")
-                        break
-                    try:
-                        # Try to parse command
-                        command = json.loads(buffer.decode('utf-8'))
-                        buffer = b''
-
-                        # Execute command in Blender's main thread
-                        def execute_wrapper():
-                            try:
-                                response = self.execute_command(command)
-                                response_json = json.dumps(response)
-                                try:
-                                    client.sendall(response_json.encode('utf-8'))
-                                except:
-                                    print("Failed to send response - client disconnected")
-                            except Exception as e:
-                                print(f"Error executing command: {str(e)}")
-                                traceback.print_exc()
-                                try:
-                                    error_response = {
-                                        "status": "error",
-                                        "message": str(e)
-                                    }
-                                    client.sendall(json.dumps(error_response).encode('utf-8'))
-                                except:
-                                    pass
-                            return None
-
-                        # Schedule execution in main thread
-                        bpy.app.timers.register(execute_wrapper, first_interval=0.0)
-                    except json.JSONDecodeError:
-                        # Incomplete data, wait for more
-                        pass
-                except Exception as e:
-                    print(f"Error receiving data: {str(e)}")
-                    break
-        except Exception as e:
-            print(f"Error in client handler: {str(e)}")
+                for key, mask in events:
+                    if key.data == "listener":
+                        self._accept_clients()
+                    elif key.data == "wakeup":
+                        with suppress(BlockingIOError, InterruptedError):
+                            while self._wakeup_recv.recv(4096):
+                                pass
+                    else:
+                        session = key.data
+                        try:
+                            if mask & selectors.EVENT_READ:
+                                self._read_session(session)
+                            if mask & selectors.EVENT_WRITE and not session.closed:
+                                self._flush_session(session)
+                        except Exception as e:
+                            # One bad client must not take down the thread serving all of them
+                            logger.exception("Error serving %s, dropping connection: %s", session.address, e)
+                            self._close_session(session)
+
+                with self._write_requests_lock:
+                    pending_writes = list(self._write_requests)
+                    self._write_requests.clear()
+                for session in pending_writes:
+                    if not session.closed:
+                        self._flush_session(session)
+
+                self._expire_stalled_reads()
         finally:
+            self._close_all()
+            logger.debug("Server thread stopped")
+
+    def _accept_clients(self):
+        while True:
             try:
+                client, address = self.socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except Exception as e:
+                logger.warning("Error accepting connection: %s", e)
+                return
+
+            if len(self.sessions) >= self.max_clients:
+                self._reject_client(client, address)
+                continue
+
+            client.setblocking(False)
+            with suppress(OSError):
+                # Let the OS detect peers that vanished without closing
+                client.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            session = _ClientSession(client, address, on_output=self._request_write)
+            self.sessions.add(session)
+            self._idle_interval = IDLE_POLL_INTERVAL
+            self._set_interest(session)
+            logger.info("Connected to client: %s", address)
+
+    def _reject_client(self, client, address):
+        """Tell a client the server is saturated, then drop the connection"""
+        logger.warning("Rejecting client %s: %d clients already connected", address, self.max_clients)
+        try:
+            client.setblocking(False)
+            client.send(json.dumps({
+                "status": "error",
+                "message": f"Server busy: {self.max_clients} clients already connected. Retry later.",
+            }).encode('utf-8'))
+        except Exception:
+            pass
+        finally:
+            with suppress(Exception):
                 client.close()
-            except:
-                pass
-            print("Client handler stopped")
+
+    def _set_interest(self, session):
+        """Register read/write interest from the session's buffers (backpressure)"""
+        if session.closed:
+            return
+        if session.reading and session.outbox_bytes > OUTBOX_HIGH_WATER:
+            session.reading = False
+        elif not session.reading and session.outbox_bytes <= OUTBOX_LOW_WATER:
+            session.reading = True
+            # The pause was ours, not the client's; restart the stall clock
+            session.last_recv = time.monotonic()
+
+        events = selectors.EVENT_READ if session.reading else 0
+        if session.outbox:
+            events |= selectors.EVENT_WRITE
+        if events == session.events:
+            return
+        if session.events == 0:
+            self.selector.register(session.client, events, data=session)
+        elif events == 0:
+            self.selector.unregister(session.client)
+        else:
+            self.selector.modify(session.client, events, data=session)
+        session.events = events
+
+    def _close_session(self, session):
+        if session.events:
+            with suppress(Exception):
+                self.selector.unregister(session.client)
+            session.events = 0
+        session.close()
+        self.sessions.discard(session)
+        logger.debug("Client handler stopped")
+
+    def _flush_session(self, session):
+        try:
+            session.flush()
+        except OSError as e:
+            logger.info("Failed to send response - client disconnected (%s)", e)
+            self._close_session(session)
+            return
+        except Exception as e:
+            # A streamed response failed to serialize after its header went out
+            logger.exception("Failed to stream response, dropping connection: %s", e)
+            self._close_session(session)
+            return
+        self._set_interest(session)
+
+    def _expire_stalled_reads(self):
+        """Drop clients that went silent in the middle of a message.
+
+        Sessions paused for outbox backpressure are skipped: the server
+        stopped reading them, so silence says nothing about the client.
+        """
+        now = time.monotonic()
+        for session in list(self.sessions):
+            if not session.reading:
+                continue
+            if session.buffer and now - session.last_recv > PARTIAL_READ_TIMEOUT:
+                logger.warning("Client %s stalled mid-message, dropping connection", session.address)
+                self._close_session(session)
+
+    def _read_session(self, session):
+        """Read available bytes from a client and queue every complete message"""
+        try:
+            data = session.client.recv(RECV_CHUNK_BYTES)
+        except (BlockingIOError, InterruptedError):
+            return
+        except Exception as e:
+            logger.warning("Error receiving data: %s", e)
+            self._close_session(session)
+            return
+
+        if not data:
+            logger.info("Client disconnected")
+            self._close_session(session)
+            return
+
+        session.last_recv = time.monotonic()
+        session.receive(data)
+        try:
+            while True:
+                message = session.next_message()
+                if message is None:
+                    # Incomplete data, wait for more
+                    break
+                command, error = message
+                received_at = time.perf_counter()
+                try:
+                    if command and command.get("type") == "negotiate_protocol":
+                        self._negotiate_protocol(session, command)
+                    elif not self._answer_on_io_thread(session, command, error, received_at):
+                        self._schedule_command(session, command, error, received_at)
+                except Exception as e:
+                    logger.exception("Error handling message: %s", e)
+                    self._reply(session, command, {"status": "error", "message": f"Could not handle message: {e}"})
+        except ProtocolError as e:
+            logger.warning("Protocol error, dropping connection: %s", e)
+            self._close_session(session)
+
+    def _negotiate_protocol(self, session, command):
+        """Switch a connection to a framed protocol.
+
+        The acknowledgement is sent using the framing that was active when the
+        request arrived; every later message in both directions uses the new one.
+        Refused while the connection has commands in flight: their replies
+        would overtake the ack or be written in the new framing.
+        """
+        params = command.get("params") or {}
+        framing = params.get("framing", FRAMING_LEGACY)
+        if session.scheduled != session.completed:
+            self._reply(session, command, {
+                "status": "error",
+                "message": "negotiate_protocol must wait until earlier commands on this connection "
+                           "have been answered",
+            })
+            return
+        if framing not in FRAMINGS:
+            self._reply(session, command, {
+                "status": "error",
+                "message": f"Unsupported framing: {framing}. Use one of {list(FRAMINGS)}",
+            })
+            return
+        streaming = framing == FRAMING_LENGTH
+        self._reply(session, command, {
+            "status": "success",
+            "result": {
+                "framing": framing,
+                "max_message_bytes": MAX_MESSAGE_BYTES,
+                "streaming": streaming,
+                "stream_chunk_bytes": STREAM_CHUNK_BYTES,
+            },
+        })
+        session.framing = framing
+        session.stream_by_default = streaming and bool(params.get("stream", False))
+        logger.debug("Client switched to %s framing", framing)
+
+    def _schedule_command(self, session, command, error=None, received_at=None):
+        """Queue a command for execution in Blender's main thread.
+
+        Commands from all connections share one FIFO drained by a single
+        persistent timer, so clients can pipeline many requests without
+        waiting for each reply. Responses go out in arrival order and echo
+        the command's "id" for correlation.
+        """
+        if received_at is None:
+            received_at = time.perf_counter()
+        session.scheduled += 1
+        if command and "id" in command:
+            key = self._key_for_cancel(command["id"])
+            with self._cancel_lock:
+                session.pending_ids[key] = session.pending_ids.get(key, 0) + 1
+        self.work_queue.put((session, command, error, received_at))
+        self._idle_interval = IDLE_POLL_INTERVAL
+
+    def _answer_on_io_thread(self, session, command, error, received_at):
+        """Fast path: answer without waiting for a main-thread tick.
+
+        Covers thread_safe handlers and unexpired results of cacheable
+        commands, so status polling doesn't queue behind a long render or
+        import. Replies on a connection stay in request order, so this path
+        is only taken when the connection has nothing queued; cancel is the
+        exception, since it has to overtake the command it targets.
+        Returns False when the command has to go through the work queue.
+        """
+        if error or not command or self.handlers is None:
+            return False
+        cmd_type = command.get("type")
+        if cmd_type != "cancel" and session.scheduled != session.completed:
+            return False
+        spec = self.handlers.get(cmd_type)
+        if spec is None:
+            return False
+
+        if spec.thread_safe:
+            self.stats.observe(cmd_type, "queue_wait", time.perf_counter() - received_at)
+            self._dispatch.session = session
+            try:
+                response = self.execute_command(command)
+            finally:
+                self._dispatch.session = None
+        elif spec.cacheable:
+            cached = self._cached_results.get(self._result_key(command))
+            if cached is None or cached[0] < time.monotonic():
+                return False
+            self.stats.observe(cmd_type, "queue_wait", time.perf_counter() - received_at)
+            self.stats.count(cmd_type)
+            response = dict(cached[1])  # _reply adds the id
+        else:
+            return False
+        self._reply(session, command, response)
+        return True
+
+    @staticmethod
+    def _result_key(command):
+        return command.get("type"), json.dumps(command.get("params") or {}, sort_keys=True, default=str)
+
+    def _remember_result(self, command, response):
+        """Keep a successful cacheable result for the I/O-thread fast path"""
+        spec = self.handlers.get(command.get("type")) if self.handlers else None
+        if spec is None or not spec.cacheable or self._is_error_result(response):
+            return
+        self._cached_results[self._result_key(command)] = (
+            time.monotonic() + CACHED_RESULT_TTL,
+            {key: value for key, value in response.items() if key != "id"},
+        )
+
+    def _drain_work_queue(self):
+        """Persistent timer callback: run queued commands within the tick budget.
+
+        At least one command runs per tick; once the budget is spent the timer
+        yields back to Blender's event loop so the viewport stays interactive.
+        """
+        if not self.running:
+            return None
+
+        deadline = time.perf_counter() + self.tick_budget
+        transaction = self.transaction
+        if transaction is not None and transaction["session"] is not None and transaction["session"].closed:
+            logger.info("Rolling back transaction '%s': client disconnected", transaction["name"])
+            with suppress(Exception):
+                self.rollback()
+        # At most one job import per tick, so commands keep flowing around long jobs
+        if self.jobs.run_main_phase():
+            self.scene_tracker.pending = True
+        while True:
+            try:
+                session, command, error, received_at = self.work_queue.get_nowait()
+            except queue.Empty:
+                return 0.0 if self.jobs.pending() else self._idle_backoff()
+
+            self._idle_interval = IDLE_POLL_INTERVAL
+            if command:
+                self.stats.observe(command.get("type"), "queue_wait", time.perf_counter() - received_at)
+            command_deadline = None
+            if not error:
+                command_deadline, error = self._command_deadline(command, received_at)
+            if error:
+                self._unqueue_id(session, command)
+                self._reply(session, command, {"status": "error", "message": error})
+            else:
+                # Running before it stops counting as queued, so a cancel() in between still finds it
+                self._current_session = session
+                self._current_command_id = command.get("id")
+                self._current_deadline = command_deadline
+                self._unqueue_id(session, command)
+                try:
+                    if self._should_start(session, command, command_deadline):
+                        try:
+                            response = self.execute_command(command)
+                        except Exception as e:
+                            logger.exception("Error executing command: %s", e)
+                            response = {"status": "error", "message": str(e)}
+                        self._remember_result(command, response)
+                        self._reply(session, command, response)
+                finally:
+                    self._current_session = None
+                    self._current_command_id = None
+                    self._current_deadline = None
+                    self._forget_cancel(session, command)
+            session.completed += 1
+
+            if time.perf_counter() >= deadline:
+                busy = not self.work_queue.empty() or self.jobs.pending()
+                return 0.0 if busy else IDLE_POLL_INTERVAL
+
+    def _idle_backoff(self):
+        """Next timer interval when there is nothing to do"""
+        interval = self._idle_interval
+        cap = IDLE_POLL_MAX_CONNECTED if self.sessions else IDLE_POLL_MAX
+        self._idle_interval = min(interval * 2, cap)
+        return min(interval, cap)
+
+    @staticmethod
+    def _command_deadline(command, received_at):
+        """(perf_counter deadline or None, error message or None) for a command's "timeout" """
+        timeout = command.get("timeout") if command else None
+        if timeout is None:
+            return None, None
+        if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0:
+            return None, f"Invalid timeout: {timeout!r}; expected a positive number of seconds"
+        return received_at + timeout, None
+
+    def _should_start(self, session, command, command_deadline):
+        """Drop a queued command whose client left, deadline passed or id was cancelled"""
+        cmd_type = command.get("type")
+        if session.closed:
+            logger.debug("Dropping %s: client disconnected", cmd_type)
+            self.stats.drop(cmd_type)
+            return False
+        message = None
+        if command_deadline is not None and time.perf_counter() > command_deadline:
+            message = f"Timed out after {command['timeout']:g}s before starting"
+        elif self._is_cancelled(session, command.get("id")):
+            message = "Cancelled before starting"
+            self._forget_cancel(session, command)
+        if message is None:
+            return True
+        logger.debug("Dropping %s: %s", cmd_type, message)
+        self.stats.drop(cmd_type)
+        self._reply(session, command, {"status": "error", "message": message})
+        return False
+
+    def _unqueue_id(self, session, command):
+        """Stop counting a dequeued command as pending for cancel()"""
+        if not command or "id" not in command:
+            return
+        key = self._key_for_cancel(command["id"])
+        with self._cancel_lock:
+            count = session.pending_ids.get(key, 0) - 1
+            if count > 0:
+                session.pending_ids[key] = count
+            else:
+                session.pending_ids.pop(key, None)
+
+    def _is_cancelled(self, session, command_id):
+        if command_id is None:
+            return False
+        with self._cancel_lock:
+            return self._key_for_cancel(command_id) in session.cancelled
+
+    def _forget_cancel(self, session, command):
+        """Drop a cancel once its command has been skipped or has run"""
+        if not command or "id" not in command:
+            return
+        key = self._key_for_cancel(command["id"])
+        with self._cancel_lock:
+            if key not in session.pending_ids:
+                session.cancelled.discard(key)
+
+    @staticmethod
+    def _key_for_cancel(command_id):
+        # ids are arbitrary JSON values; 7 and "7" name the same request
+        return str(command_id)
+
+    def cancel(self, request_id):
+        """Cancel a command sent earlier on this connection by its "id".
+
+        A queued command is dropped when it reaches the front of the queue; a
+        running execute_code stops at its next Python line or, in a loop on
+        a single line, its next bytecode. Other handlers can't be interrupted once started. Ids that
+        aren't queued or running on this connection report state "unknown"
+        and are not remembered, so a late cancel can't hit a reused id.
+        """
+        session = getattr(self._dispatch, "session", None) or self._current_session
+        if session is None:
+            return {"success": False, "request_id": request_id, "state": "unknown"}
+        key = self._key_for_cancel(request_id)
+        current_id = self._current_command_id
+        running = (
+            self._current_session is session
+            and current_id is not None
+            and self._key_for_cancel(current_id) == key
+        )
+        with self._cancel_lock:
+            pending = key in session.pending_ids
+            if pending or running:
+                session.cancelled.add(key)
+        if running:
+            self._trace_running_snippet()
+            return {"success": True, "request_id": request_id, "state": "running"}
+        if pending:
+            return {"success": True, "request_id": request_id, "state": "pending"}
+        return {"success": False, "request_id": request_id, "state": "unknown"}
+
+    def _trace_running_snippet(self):
+        """Make the running execute_code check its deadline and cancel() on every line.
+
+        Snippets are traced on function calls only, which a loop like
+        `while True: x += 1` never makes; setting f_trace on the live frames
+        switches them to line (and where needed opcode) events from here on.
+        Called from cancel() and the deadline timer, off the main thread.
+        """
+        trace_lines = self._line_trace
+        thread = self._code_thread
+        if trace_lines is None or thread is None:
+            return
+        frame = sys._current_frames().get(thread)
+        while frame is not None:
+            if frame.f_code.co_filename.startswith("<execute_code"):
+                frame.f_trace = trace_lines
+                if TRACE_OPCODES:
+                    frame.f_trace_opcodes = True
+            frame = frame.f_back
+
+    def _code_trace(self):
+        """sys.settrace hooks enforcing the current command's deadline and cancel().
+
+        Returns (hook to install, per-line hook), or (None, None). The
+        installed hook only runs on function calls, so snippets run at close
+        to full speed; cancel() and the deadline timer switch the running
+        frames to the per-line hook when it is time to stop.
+        """
+        command_deadline = self._current_deadline
+        command_id = self._current_command_id
+        session = self._current_session
+        if session is None or (command_deadline is None and command_id is None):
+            return None, None
+        cancelled_ids = session.cancelled
+        cancel_key = self._key_for_cancel(command_id) if command_id is not None else None
+
+        def check():
+            if command_deadline is not None and time.perf_counter() > command_deadline:
+                raise CommandInterrupted("timed out")
+            # Plain membership test: atomic under the GIL, and this runs a lot
+            if cancel_key is not None and cancel_key in cancelled_ids:
+                raise CommandInterrupted("cancelled")
+
+        def trace_lines(frame, event, arg):
+            check()
+            return trace_lines
+
+        def trace_calls(frame, event, arg):
+            check()
+            return None
+
+        return trace_calls, trace_lines
+
+    def _reply(self, session, command, response):
+        """Send a response, echoing the command's correlation id if it had one"""
+        if command and "id" in command:
+            response["id"] = command["id"]
+        cmd_type = command.get("type") if command else None
+        transfer = command.get("transfer", TRANSFER_BASE64) if command else TRANSFER_BASE64
+        stream = command.get("stream", session.stream_by_default) if command else False
+        if stream and session.framing == FRAMING_LENGTH:
+            try:
+                session.send_stream(self._stream_frames(response, session.payload_encoder(transfer), cmd_type),
+                                    on_sent=self._send_timer(cmd_type))
+            except Exception:
+                logger.info("Failed to send response - client disconnected")
+            return
+        try:
+            started = time.perf_counter()
+            chunks = session.encode(response, transfer)
+            if cmd_type:
+                self.stats.observe(cmd_type, "serialize", time.perf_counter() - started)
+            session.send_bytes(*chunks, on_sent=self._send_timer(cmd_type))
+        except Exception:
+            logger.info("Failed to send response - client disconnected")
+
+    def _send_timer(self, cmd_type):
+        """on_sent callback recording the send metric, or None for untyped replies"""
+        if not cmd_type:
+            return None
+        queued = time.perf_counter()
+        return lambda: self.stats.observe(cmd_type, "send", time.perf_counter() - queued)
+
+    def _stream_frames(self, response, encoder, cmd_type=None):
+        """Yield a streamed response: header frame, data frames, empty end frame.
+
+        Runs on the I/O thread, so the response is never held in memory as a
+        single string: it is encoded a page at a time by _json_pieces. Time
+        spent encoding (not waiting for the socket) is recorded as the
+        serialize metric. Binary payload frames, if any, follow the end frame.
+        """
+        header = {"stream": "begin", "encoding": "json"}
+        if "id" in response:
+            header["id"] = response["id"]
+        payload = json.dumps(header).encode('utf-8')
+        yield LENGTH_PREFIX.pack(len(payload)) + payload
+
+        def data_frames(pieces):
+            data = "".join(pieces).encode('utf-8')
+            chunks = (data[offset:offset + STREAM_CHUNK_BYTES] for offset in range(0, len(data), STREAM_CHUNK_BYTES))
+            return [LENGTH_PREFIX.pack(len(chunk)) + chunk for chunk in chunks]
+
+        serialize = 0.0
+        started = time.perf_counter()
+        pending = []
+        pending_size = 0
+        for piece in self._json_pieces(response, encoder):
+            pending.append(piece)
+            pending_size += len(piece)
+            if pending_size >= STREAM_CHUNK_BYTES:
+                frames = data_frames(pending)
+                pending = []
+                pending_size = 0
+                serialize += time.perf_counter() - started
+                yield from frames
+                started = time.perf_counter()
+        frames = data_frames(pending) if pending else []
+        serialize += time.perf_counter() - started
+        if cmd_type:
+            self.stats.observe(cmd_type, "serialize", serialize)
+        yield from frames
+        yield LENGTH_PREFIX.pack(0)
+        yield from encoder.binary_frames()
+
+    @classmethod
+    def _json_pieces(cls, value, encoder, depth=0):
+        """JSON text of value in pieces of at most about STREAM_CHUNK_BYTES.
+
+        Leaves and deep containers go through json.dumps, whose C encoder is
+        several times faster than JSONEncoder.iterencode; containers near
+        the top are split per item and long strings (base64) per slice, so
+        no piece is much bigger than a page.
+        """
+        if isinstance(value, BinaryPayload):
+            value = encoder(value)
+        if isinstance(value, str) and len(value) > STREAM_CHUNK_BYTES:
+            yield '"'
+            for offset in range(0, len(value), STREAM_CHUNK_BYTES):
+                # Slices split between code points, so escaping them separately is safe
+                yield json.dumps(value[offset:offset + STREAM_CHUNK_BYTES])[1:-1]
+            yield '"'
+        elif depth < STREAM_SPLIT_DEPTH and isinstance(value, dict):
+            yield "{"
+            for index, (key, item) in enumerate(value.items()):
+                # Non-string keys are converted the way json.dumps does it
+                key = key if isinstance(key, str) else json.dumps(key)
+                yield f"{', ' if index else ''}{json.dumps(key)}: "
+                yield from cls._json_pieces(item, encoder, depth + 1)
+            yield "}"
+        elif depth < STREAM_SPLIT_DEPTH and isinstance(value, (list, tuple)):
+            yield "["
+            if depth + 1 < STREAM_SPLIT_DEPTH:
+                for index, item in enumerate(value):
+                    if index:
+                        yield ", "
+                    yield from cls._json_pieces(item, encoder, depth + 1)
+            else:
+                # Items won't be split further, so encode them in runs; one call
+                # per record would cost more than the encoding itself
+                for start in range(0, len(value), STREAM_BATCH_ITEMS):
+                    batch = value[start:start + STREAM_BATCH_ITEMS]
+                    if start:
+                        yield ", "
+                    if any(isinstance(item, BinaryPayload)
+                           or (isinstance(item, str) and len(item) > STREAM_CHUNK_BYTES) for item in batch):
+                        for index, item in enumerate(batch):
+                            if index:
+                                yield ", "
+                            yield from cls._json_pieces(item, encoder, depth + 1)
+                    else:
+                        yield json.dumps(list(batch), default=encoder)[1:-1]
+            yield "]"
+        else:
+            yield json.dumps(value, default=encoder)
 
     def execute_command(self, command):
         """Execute a command in the main Blender thread"""
@@ -193,99 +2194,531 @@ class BlenderMCPServer:
             return self._execute_command_internal(command)
 
         except Exception as e:
-            print(f"Error executing command: {str(e)}")
-            traceback.print_exc()
+            logger.exception("Error executing command: %s", e)
             return {"status": "error", "message": str(e)}
 
-    def _execute_command_internal(self, command):
-        """Internal command execution with proper context"""
-        cmd_type = command.get("type")
-        params = command.get("params", {})
+    def refresh_handlers(self, scene=None):
+        """Build the command registry from the scene's integration toggles.
+
+        Called on start() and from the blendermcp_use_* property update
+        callbacks, so dispatch never rebuilds the table per command.
+        """
+        if scene is None:
+            scene = bpy.context.scene
+        spec = CommandSpec
+        # Swapped in whole so the I/O thread never sees a partial update
+        self.settings = {
+            "use_polyhaven": scene.blendermcp_use_polyhaven,
+            "asset_cache_mb": scene.blendermcp_asset_cache_mb,
+            "use_hyper3d": scene.blendermcp_use_hyper3d,
+            "hyper3d_mode": scene.blendermcp_hyper3d_mode,
+            "hyper3d_api_key": scene.blendermcp_hyper3d_api_key,
+            "use_sketchfab": scene.blendermcp_use_sketchfab,
+            "sketchfab_api_key": scene.blendermcp_sketchfab_api_key,
+            "orphan_purge": scene.blendermcp_orphan_purge,
+        }
+        self._cached_results = {}
 
         # Base handlers that are always available
         handlers = {
-            "get_scene_info": self.get_scene_info,
-            "get_object_info": self.get_object_info,
-            "get_all_object_info": self.get_all_object_info,
-            "get_viewport_screenshot": self.get_viewport_screenshot,
-            "execute_code": self.execute_code,
-            "list_materials": self.list_materials,
-            "delete_object": self.delete_object,
-            "set_object_transform": self.set_object_transform,
-            "rename_object": self.rename_object,
-            "duplicate_object": self.duplicate_object,
-            "join_objects": self.join_objects,
-            "add_modifier": self.add_modifier,
-            "apply_modifier": self.apply_modifier,
-            "apply_transforms": self.apply_transforms,
-            "shade_smooth": self.shade_smooth,
-            "parent_set": self.parent_set,
-            "parent_clear": self.parent_clear,
-            "set_origin": self.set_origin,
-            "move_to_collection": self.move_to_collection,
-            "set_visibility": self.set_visibility,
-            "export_object": self.export_object,
-            "list_installed_addons": self.list_installed_addons,
-            "create_material": self.create_material,
-            "assign_material": self.assign_material,
-            "add_light": self.add_light,
-            "set_light_properties": self.set_light_properties,
-            "add_camera": self.add_camera,
-            "set_camera_properties": self.set_camera_properties,
-            "set_render_settings": self.set_render_settings,
-            "render_image": self.render_image,
-            "get_polyhaven_status": self.get_polyhaven_status,
-            "get_hyper3d_status": self.get_hyper3d_status,
-            "get_sketchfab_status": self.get_sketchfab_status,
+            "get_scene_info": spec(self.get_scene_info, read_only=True),
+            "get_object_info": spec(self.get_object_info, read_only=True),
+            "get_all_object_info": spec(self.get_all_object_info, read_only=True),
+            "get_scene_delta": spec(self.get_scene_delta, read_only=True),
+            "query_objects_in_box": spec(self.query_objects_in_box, read_only=True),
+            "nearest_objects": spec(self.nearest_objects, read_only=True),
+            "find_overlapping_objects": spec(self.find_overlapping_objects, read_only=True),
+            "get_viewport_screenshot": spec(self.get_viewport_screenshot, read_only=True, heavy=True),
+            "execute_code": spec(self.execute_code, heavy=True),
+            "list_code_namespaces": spec(self.list_code_namespaces, read_only=True),
+            "drop_code_namespace": spec(self.drop_code_namespace),
+            "list_materials": spec(self.list_materials, read_only=True),
+            "delete_object": spec(self.delete_object),
+            "set_object_transform": spec(self.set_object_transform),
+            "rename_object": spec(self.rename_object),
+            "duplicate_object": spec(self.duplicate_object),
+            "join_objects": spec(self.join_objects),
+            "add_modifier": spec(self.add_modifier),
+            "apply_modifier": spec(self.apply_modifier),
+            "apply_transforms": spec(self.apply_transforms),
+            "shade_smooth": spec(self.shade_smooth),
+            "parent_set": spec(self.parent_set),
+            "parent_clear": spec(self.parent_clear),
+            "set_origin": spec(self.set_origin),
+            "move_to_collection": spec(self.move_to_collection),
+            "set_visibility": spec(self.set_visibility),
+            "export_object": spec(self.export_object),
+            "list_installed_addons": spec(self.list_installed_addons, read_only=True, cacheable=True),
+            "create_material": spec(self.create_material),
+            "assign_material": spec(self.assign_material),
+            "add_light": spec(self.add_light),
+            "set_light_properties": spec(self.set_light_properties),
+            "add_camera": spec(self.add_camera),
+            "set_camera_properties": spec(self.set_camera_properties),
+            "set_render_settings": spec(self.set_render_settings),
+            "render_image": spec(self.render_image, heavy=True),
+            "purge_orphans": spec(self.purge_orphans),
+            "get_data_stats": spec(self.get_data_stats, read_only=True),
+            "get_polyhaven_status": spec(self.get_polyhaven_status, main_thread=False, read_only=True,
+                                         thread_safe=True),
+            "get_hyper3d_status": spec(self.get_hyper3d_status, main_thread=False, read_only=True,
+                                       thread_safe=True),
+            "get_sketchfab_status": spec(self.get_sketchfab_status, read_only=True),
+            "batch": spec(self.batch),
+            "begin_transaction": spec(self.begin_transaction),
+            "commit": spec(self.commit),
+            "rollback": spec(self.rollback),
+            "list_commands": spec(self.list_commands, main_thread=False, read_only=True, thread_safe=True),
+            "get_server_stats": spec(self.get_server_stats, main_thread=False, read_only=True,
+                                     thread_safe=True),
+            "get_server_logs": spec(self.get_server_logs, main_thread=False, read_only=True,
+                                    thread_safe=True),
+            "set_log_level": spec(self.set_log_level, main_thread=False, thread_safe=True),
+            "get_job_status": spec(self.get_job_status, main_thread=False, read_only=True, thread_safe=True),
+            "list_jobs": spec(self.list_jobs, main_thread=False, read_only=True, thread_safe=True),
+            "cancel_job": spec(self.cancel_job, main_thread=False, thread_safe=True),
+            "cancel": spec(self.cancel, main_thread=False, thread_safe=True),
         }
 
         # Add Polyhaven handlers only if enabled
-        if bpy.context.scene.blendermcp_use_polyhaven:
-            polyhaven_handlers = {
-                "get_polyhaven_categories": self.get_polyhaven_categories,
-                "search_polyhaven_assets": self.search_polyhaven_assets,
-                "download_polyhaven_asset": self.download_polyhaven_asset,
-                "set_texture": self.set_texture,
-            }
-            handlers.update(polyhaven_handlers)
+        if scene.blendermcp_use_polyhaven:
+            handlers.update({
+                # These block on the network or disk in the main-thread timer; caching
+                # keeps repeats off it, and the requests have timeouts
+                "get_polyhaven_categories": spec(self.get_polyhaven_categories, read_only=True, cacheable=True),
+                "search_polyhaven_assets": spec(self.search_polyhaven_assets, read_only=True, cacheable=True),
+                "download_polyhaven_asset": spec(self.download_polyhaven_asset, heavy=True),
+                "clear_polyhaven_cache": spec(self.clear_polyhaven_cache),
+                "set_texture": spec(self.set_texture),
+            })
 
         # Add Hyper3d handlers only if enabled
-        if bpy.context.scene.blendermcp_use_hyper3d:
-            hyper3d_handlers = {
-                "create_rodin_job": self.create_rodin_job,
-                "poll_rodin_job_status": self.poll_rodin_job_status,
-                "import_generated_asset": self.import_generated_asset,
-            }
-            handlers.update(hyper3d_handlers)
+        if scene.blendermcp_use_hyper3d:
+            handlers.update({
+                "create_rodin_job": spec(self.create_rodin_job),
+                "poll_rodin_job_status": spec(self.poll_rodin_job_status, read_only=True),
+                "import_generated_asset": spec(self.import_generated_asset, heavy=True),
+            })
 
         # Add Sketchfab handlers only if enabled
-        if bpy.context.scene.blendermcp_use_sketchfab:
-            sketchfab_handlers = {
-                "search_sketchfab_models": self.search_sketchfab_models,
-                "download_sketchfab_model": self.download_sketchfab_model,
-            }
-            handlers.update(sketchfab_handlers)
+        if scene.blendermcp_use_sketchfab:
+            handlers.update({
+                "search_sketchfab_models": spec(self.search_sketchfab_models, read_only=True),
+                "download_sketchfab_model": spec(self.download_sketchfab_model, heavy=True),
+            })
+
+        self.handlers = handlers
+
+    def get_command_spec(self, cmd_type):
+        """Registry entry for a command type, or None if it is unknown or disabled"""
+        if self.handlers is None:
+            self.refresh_handlers()
+        return self.handlers.get(cmd_type)
+
+    def _execute_command_internal(self, command):
+        """Internal command execution with proper context"""
+        cmd_type = command.get("type")
+        params = command.get("params", {})
 
-        handler = handlers.get(cmd_type)
-        if handler:
+        spec = self.get_command_spec(cmd_type)
+        if spec:
+            in_batch = self._batch_specs is not None
+            if in_batch:
+                self._batch_specs.append(spec)
+            elif cmd_type == "batch":
+                self._batch_specs = []
+            before = self._datablock_counts() if not in_batch and (spec.heavy or cmd_type == "batch") else None
+            if spec.main_thread and not spec.read_only:
+                self.scene_tracker.pending = True
+            started = time.perf_counter()
             try:
-                print(f"Executing handler for {cmd_type}")
-                result = handler(**params)
-                print(f"Handler execution complete")
-                return {"status": "success", "result": result}
+                logger.debug("Executing handler for %s", cmd_type)
+                result = spec.handler(**params)
+                logger.debug("Handler execution complete")
+                response = {"status": "success", "result": result}
             except Exception as e:
-                print(f"Error in handler: {str(e)}")
-                traceback.print_exc()
-                return {"status": "error", "message": str(e)}
+                logger.exception("Error in handler for %s: %s", cmd_type, e)
+                response = {"status": "error", "message": str(e)}
+            finally:
+                if cmd_type == "batch" and not in_batch:
+                    items, self._batch_specs = self._batch_specs, None
+                    # The batch is as heavy as its heaviest item and read-only only if all items are
+                    spec = spec._replace(heavy=any(item.heavy for item in items),
+                                         read_only=all(item.read_only for item in items))
+            self.stats.observe(cmd_type, "handler", time.perf_counter() - started)
+            self.stats.count(cmd_type, failed=self._is_error_result(response))
+            # Batch items are accounted and purged once, after the whole batch
+            if not in_batch and (spec.heavy or (spec.main_thread and not spec.read_only)):
+                self._after_command(cmd_type, spec, before)
+            return response
         else:
             return {"status": "error", "message": f"Unknown command type: {cmd_type}"}
 
+    @staticmethod
+    def _datablock_counts():
+        return {attr: len(getattr(bpy.data, attr)) for attr in DATABLOCK_TYPES}
+
+    @staticmethod
+    def _estimate_data_bytes():
+        """Rough size of mesh and loaded image data; ignores everything else"""
+        total = 0
+        for mesh in bpy.data.meshes:
+            total += (len(mesh.vertices) * 32 + len(mesh.edges) * 16
+                      + len(mesh.loops) * 24 + len(mesh.polygons) * 24)
+        for image in bpy.data.images:
+            # has_data first: reading size would load an unloaded image
+            if image.has_data:
+                width, height = image.size
+                total += width * height * image.channels * (4 if image.is_float else 1)
+        return total
+
+    def _after_command(self, cmd_type, spec, before):
+        """Account a heavy command's datablock growth and apply the orphan purge policy.
+
+        Only collection lengths are read here; the byte estimate walks every
+        mesh and image, so it is left to get_data_stats.
+        """
+        policy = self.settings.get("orphan_purge", "OFF")
+        # Read-only commands never purge: a screenshot must not cost the user data
+        purge = (not spec.read_only and self.transaction is None
+                 and (policy == "ALWAYS" or (policy == "HEAVY" and spec.heavy)))
+        if not spec.heavy and not purge:
+            return
+        try:
+            if spec.heavy:
+                # Growth is measured before purging, so it reflects the handler alone
+                counts = self._datablock_counts()
+                self.stats.account(cmd_type, sum(counts.values()) - sum(before.values()))
+            purged = self._purge_orphans() if purge else {}
+            if spec.heavy:
+                if purged:
+                    counts = self._datablock_counts()
+                self.data_stats = {
+                    "datablocks": counts,
+                    "orphans": len(self._orphans_seen),
+                    "updated_at": time.time(),
+                }
+            if purged:
+                logger.debug("Purged orphans after %s: %s", cmd_type, purged)
+        except Exception as e:
+            logger.warning("Data accounting after %s failed: %s", cmd_type, e)
+
+    def _purge_orphans(self, grace=ORPHAN_GRACE_SECONDS):
+        """Remove datablocks that have had no users for at least grace seconds.
+
+        Returns removed counts by bpy.data collection. Fake users count as
+        users, and linked library data is left alone.
+        """
+        now = time.monotonic()
+        seen = {}
+        doomed = []
+        doomed_pointers = []
+        removed = {}
+        for attr in DATABLOCK_TYPES:
+            for block in getattr(bpy.data, attr):
+                if block.users or block.library is not None:
+                    continue
+                pointer = block.as_pointer()
+                first_seen = self._orphans_seen.get(pointer, now)
+                seen[pointer] = first_seen
+                if now - first_seen >= grace:
+                    doomed.append(block)
+                    doomed_pointers.append(pointer)
+                    removed[attr] = removed.get(attr, 0) + 1
+        if doomed:
+            bpy.data.batch_remove(doomed)
+            for pointer in doomed_pointers:
+                seen.pop(pointer, None)
+            self.orphans_purged += len(doomed)
+        self._orphans_seen = seen
+        return removed
+
+    def purge_orphans(self, recursive=True):
+        """Remove every datablock without users now, ignoring the grace period.
+
+        recursive repeats until nothing is left, so images freed by a removed
+        material go too (like data_utils.purge_orphans).
+        """
+        if self.transaction is not None:
+            return {"error": "Commit or roll back the open transaction before purging"}
+        removed = {}
+        while True:
+            purged = self._purge_orphans(grace=0.0)
+            for attr, count in purged.items():
+                removed[attr] = removed.get(attr, 0) + count
+            if not purged or not recursive:
+                break
+        return {"success": True, "removed": removed, "total": sum(removed.values())}
+
+    def get_data_stats(self):
+        """Current datablock counts, orphans and estimated mesh/image memory"""
+        counts = self._datablock_counts()
+        orphans = {}
+        for attr in DATABLOCK_TYPES:
+            count = sum(1 for block in getattr(bpy.data, attr) if not block.users and block.library is None)
+            if count:
+                orphans[attr] = count
+        return {
+            "datablocks": counts,
+            "orphans": orphans,
+            "estimated_data_mb": round(self._estimate_data_bytes() / (1024 * 1024), 1),
+            "orphans_purged": self.orphans_purged,
+            "purge_policy": self.settings.get("orphan_purge", "OFF"),
+        }
+
+    def list_commands(self):
+        """List the currently available commands with their scheduling metadata"""
+        if self.handlers is None:
+            self.refresh_handlers()
+        return {
+            name: {
+                "main_thread": spec.main_thread,
+                "read_only": spec.read_only,
+                "cacheable": spec.cacheable,
+                "thread_safe": spec.thread_safe,
+                "heavy": spec.heavy,
+            }
+            for name, spec in self.handlers.items()
+        }
+
+    def get_server_stats(self, reset=False):
+        """Latency percentiles per command type plus queue and uptime figures.
+
+        Times are split into queue wait, handler execution, JSON serialization
+        and socket send so slow turns can be attributed to Blender or the wire.
+        """
+        stats = {
+            "uptime_seconds": round(time.time() - self.stats.started_at, 1),
+            "queue_depth": self.work_queue.qsize(),
+            "clients": len(self.sessions),
+            "max_clients": self.max_clients,
+            "tick_budget_ms": round(self.tick_budget * 1000, 3),
+            "transaction": self.transaction["name"] if self.transaction else None,
+            "data": self.data_stats,
+            "orphans_purged": self.orphans_purged,
+            "commands": self.stats.summary(),
+        }
+        if reset:
+            self.stats.reset()
+        return stats
+
+    def get_server_logs(self, since_seq=0, level=None, limit=200):
+        """Fetch recent log records from the in-memory ring buffer.
+
+        Pass the last seen "seq" as since_seq to poll incrementally.
+        """
+        min_level = logging.NOTSET
+        if level:
+            if level.upper() not in LOG_LEVELS:
+                return {"error": f"Invalid level: {level}. Use one of {list(LOG_LEVELS)}"}
+            min_level = logging.getLevelName(level.upper())
+        records = _log_ring.fetch(since_seq=int(since_seq), min_level=min_level, limit=int(limit))
+        return {
+            "level": logging.getLevelName(logger.level),
+            "last_seq": _log_ring.sequence,
+            "records": records,
+        }
+
+    def set_log_level(self, level):
+        """Change the addon log level; DEBUG traces every command"""
+        level = str(level).upper()
+        if level not in LOG_LEVELS:
+            return {"error": f"Invalid level: {level}. Use one of {list(LOG_LEVELS)}"}
+        logger.setLevel(level)
+        return {"success": True, "level": level}
+
+    def _start_job(self, kind, fetch, finish, notify=False):
+        """Submit a background job and return its handle.
+
+        With notify, progress updates are pushed to the requesting connection
+        as {"event": "job", "job": {...}} messages; that needs ndjson or
+        length-prefixed framing, since legacy framing can't separate them
+        from replies.
+        """
+        session = self._current_session
+        notify = bool(notify) and session is not None and session.framing != FRAMING_LEGACY
+        job = self.jobs.submit(kind, fetch, finish, session if notify else None, notify)
+        return {"job_id": job.id, "kind": kind, "state": job.state, "notify": notify}
+
+    @staticmethod
+    def _run_phases(fetch, finish):
+        """Run a job's phases inline, for callers that didn't ask for a job"""
+        fetched = fetch(None) if fetch is not None else None
+        if _JobManager._failed(fetched):
+            _JobManager._discard(fetched)
+            return fetched
+        try:
+            return finish(None, fetched)
+        finally:
+            _JobManager._discard(fetched)
+
+    def _push_job_update(self, job):
+        session = job.session
+        if session is None or session.closed:
+            return
+        try:
+            session.send({"event": "job", "job": job.summary()})
+        except Exception:
+            logger.debug("Could not push update for %s; client gone", job.id)
+
+    def get_job_status(self, job_id):
+        """State, progress and (once finished) result of a background job"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return {"error": f"Unknown job: {job_id}"}
+        return job.summary()
+
+    def list_jobs(self, include_finished=True):
+        """Background jobs, oldest first"""
+        jobs = self.jobs.list()
+        if not include_finished:
+            jobs = [job for job in jobs if job.state not in JOB_FINAL_STATES]
+        return {"jobs": [{k: v for k, v in job.summary().items() if k != "result"} for job in jobs]}
+
+    def cancel_job(self, job_id):
+        """Request cancellation; downloads stop at the next chunk, queued imports are skipped"""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return {"error": f"Unknown job: {job_id}"}
+        if job.state in JOB_FINAL_STATES:
+            return {"error": f"Job {job_id} already {job.state}"}
+        if job.kind == "render_image" and job.state == "importing":
+            return {"error": "A running render can't be cancelled remotely; press Esc in Blender"}
+        job.cancel_event.set()
+        return {"success": True, "job_id": job_id, "state": job.state}
+
+    @staticmethod
+    def _is_error_result(response):
+        """True for error envelopes and for handler results that report failure in-band"""
+        if response.get("status") == "error":
+            return True
+        result = response.get("result")
+        return isinstance(result, dict) and ("error" in result or result.get("succeed") is False)
+
+    def batch(self, commands, stop_on_error=True, transaction=False):
+        """Run a list of {type, params} commands back to back in one main-thread tick.
+
+        Returns one entry per executed command. With stop_on_error the batch
+        ends at the first failing command (including handlers that return an
+        "error" key); otherwise every command runs and failures are reported
+        per item.
+
+        With transaction=True (or a name) the batch runs as one transaction:
+        committed as a single undo step if nothing failed, otherwise rolled
+        back to the state before the batch.
+        """
+        if not isinstance(commands, list):
+            raise ValueError("commands must be a list of {type, params} objects")
+        if transaction:
+            begun = self.begin_transaction(transaction if isinstance(transaction, str) else "ModelForge batch")
+            if "error" in begun:
+                return begun
+
+        results = []
+        failed = 0
+        try:
+            for index, item in enumerate(commands):
+                if not isinstance(item, dict) or _command_shape_error(item):
+                    response = {"status": "error", "message": "Batch item must be an object with a string 'type' "
+                                                              "and object 'params'"}
+                elif item["type"] in ("batch", "begin_transaction", "commit", "rollback"):
+                    response = {"status": "error", "message": f"{item['type']} is not allowed inside a batch"}
+                else:
+                    response = self.execute_command(item)
+
+                failed_item = self._is_error_result(response)
+                results.append({"index": index, "type": item.get("type") if isinstance(item, dict) else None, **response})
+                if failed_item:
+                    failed += 1
+                    if stop_on_error:
+                        break
+        except BaseException:
+            if transaction:
+                with suppress(Exception):
+                    self.rollback()
+            raise
+
+        summary = {
+            "results": results,
+            "executed": len(results),
+            "total": len(commands),
+            "failed": failed,
+            "stopped_early": len(results) < len(commands),
+        }
+        if transaction:
+            if failed:
+                self.rollback()
+                summary["transaction"] = "rolled_back"
+            else:
+                self.commit()
+                summary["transaction"] = "committed"
+        return summary
+
+    @staticmethod
+    def _undo(op, **kwargs):
+        """Run an ed.undo* operator; outside a window region they fail their poll"""
+        if bpy.app.background or not bpy.context.window_manager.windows:
+            raise RuntimeError("Transactions need Blender's undo system, which background mode doesn't have")
+        window = bpy.context.window_manager.windows[0]
+        with bpy.context.temp_override(window=window, screen=window.screen):
+            op(**kwargs)
+
+    def begin_transaction(self, name="ModelForge step"):
+        """Checkpoint the file so the following commands can be committed or rolled back as one.
+
+        Commands run through the socket don't push undo steps of their own,
+        so the whole transaction becomes a single step. One transaction can
+        be open at a time; it is rolled back if its client disconnects.
+        """
+        if self.transaction is not None:
+            return {"error": f"Transaction '{self.transaction['name']}' is already open; commit or rollback first"}
+        if bpy.context.preferences.edit.undo_steps == 0:
+            return {"error": "Undo is disabled (Preferences > Editing > Undo Steps is 0)"}
+        if bpy.context.mode != 'OBJECT':
+            # Edit-mode undo steps only cover the edited data, not the whole file
+            return {"error": f"Transactions need Object Mode; the current mode is {bpy.context.mode}"}
+        self._undo(bpy.ops.ed.undo_push, message=f"{name} (checkpoint)")
+        self.transaction = {"name": name, "started_at": time.time(), "session": self._current_session}
+        return {"success": True, "name": name}
+
+    def commit(self):
+        """Close the open transaction, keeping its changes as one undo step"""
+        transaction = self.transaction
+        if transaction is None:
+            return {"error": "No transaction is open"}
+        self.transaction = None
+        self._undo(bpy.ops.ed.undo_push, message=transaction["name"])
+        return {
+            "success": True,
+            "name": transaction["name"],
+            "duration_ms": round((time.time() - transaction["started_at"]) * 1000, 1),
+        }
+
+    def rollback(self):
+        """Undo everything since begin_transaction in one step.
 
+        The discarded state stays on the redo stack, so it can still be
+        inspected in Blender with Redo.
+        """
+        transaction = self.transaction
+        if transaction is None:
+            return {"error": "No transaction is open"}
+        self.transaction = None
+        # Undo returns to the previous step, so record the current state first
+        self._undo(bpy.ops.ed.undo_push, message=f"{transaction['name']} (rolled back)")
+        self._undo(bpy.ops.ed.undo)
+        # Undo reallocates datablocks; cached records and pointers are stale
+        self.scene_tracker.reset(bpy.context.scene)
+        return {
+            "success": True,
+            "name": transaction["name"],
+            "duration_ms": round((time.time() - transaction["started_at"]) * 1000, 1),
+        }
 
     def get_scene_info(self):
         """Get information about the current Blender scene"""
         try:
-            print("Getting scene info...")
+            logger.debug("Getting scene info...")
             # Simplify the scene info to reduce data size
             scene_info = {
                 "name": bpy.context.scene.name,
@@ -309,11 +2742,10 @@ class BlenderMCPServer:
                 }
                 scene_info["objects"].append(obj_info)
 
-            print(f"Scene info collected: {len(scene_info['objects'])} objects")
+            logger.debug("Scene info collected: %d objects", len(scene_info['objects']))
             return scene_info
         except Exception as e:
-            print(f"Error in get_scene_info: {str(e)}")
-            traceback.print_exc()
+            logger.exception("Error in get_scene_info: %s", e)
             return {"error": str(e)}
 
     @staticmethod
@@ -322,21 +2754,52 @@ class BlenderMCPServer:
         if obj.type != 'MESH':
             raise TypeError("Object must be a mesh")
 
-        # Get the bounding box corners in local space
-        local_bbox_corners = [mathutils.Vector(corner) for corner in obj.bound_box]
-
-        # Convert to world coordinates
-        world_bbox_corners = [obj.matrix_world @ corner for corner in local_bbox_corners]
-
-        # Compute axis-aligned min/max coordinates
-        min_corner = mathutils.Vector(map(min, zip(*world_bbox_corners)))
-        max_corner = mathutils.Vector(map(max, zip(*world_bbox_corners)))
-
-        return [
-            [*min_corner], [*max_corner]
-        ]
+        return BlenderMCPServer._get_aabbs([obj])[0]
 
+    @staticmethod
+    def _get_aabbs(objects):
+        """World-space AABBs for many objects in one batched transform.
 
+        Gathers every object's local bound_box corners and matrix_world into
+        NumPy arrays, transforms all corners with a single matmul and reduces
+        per object. Returns [[min], [max]] per object, in input order.
+        """
+        count = len(objects)
+        if not count:
+            return []
+        corners = np.empty((count, 8, 3))
+        matrices = np.empty((count, 4, 4))
+        for i, obj in enumerate(objects):
+            corners[i] = obj.bound_box
+            matrices[i] = obj.matrix_world
+
+        # (n, 8, 3) @ (n, 3, 3)^T + translation
+        world = corners @ matrices[:, :3, :3].transpose(0, 2, 1) + matrices[:, None, :3, 3]
+        bounds = np.stack((world.min(axis=1), world.max(axis=1)), axis=1)
+        return bounds.tolist()
+
+
+
+    def _sync_scene_tracker(self):
+        """Flush pending depsgraph updates so the change log and record cache are current.
+
+        Edits made earlier in the same tick (or the same batch) are only
+        tagged until the view layer is evaluated; evaluating it runs
+        depsgraph_update_post, which invalidates the affected records. Edits
+        from the UI are evaluated before timers run, so the view layer is
+        only updated after commands and job phases that could edit data.
+        """
+        scene = bpy.context.scene
+        tracker = self.scene_tracker
+        if tracker.pending:
+            bpy.context.view_layer.update()
+            tracker.pending = False
+        if tracker.scene_pointer != scene.as_pointer():
+            tracker.reset(scene)
+        elif len(scene.objects) != len(tracker.objects):
+            # Safety net for membership changes the depsgraph did not report
+            tracker.record(scene, membership=True)
+        return scene
 
     def get_object_info(self, name):
         """Get detailed information about a specific object"""
@@ -344,6 +2807,11 @@ class BlenderMCPServer:
         if not obj:
             raise ValueError(f"Object not found: {name}")
 
+        self._sync_scene_tracker()
+        return self.scene_tracker.cached_record(obj, "detail", self._build_object_detail)
+
+    def _build_object_detail(self, obj):
+        """Unrounded transforms, world AABB, materials and mesh stats for get_object_info"""
         # Basic object info
         obj_info = {
             "name": obj.name,
@@ -375,101 +2843,294 @@ class BlenderMCPServer:
 
         return obj_info
 
-    def get_all_object_info(self, max_objects=50, start_index=0):
-        """Get detailed information about all objects in the scene.
-        Returns a list of object details including type, transforms, materials,
-        mesh stats, and modifiers for every object.
-        Supports pagination via max_objects and start_index."""
-        try:
-            print("Getting all object info...")
-            all_scene_objects = list(bpy.context.scene.objects)
-            total_count = len(all_scene_objects)
-            subset = all_scene_objects[start_index:start_index + max_objects]
-            all_objects = []
+    def _build_object_record(self, obj, bounding_box=None, fields=None):
+        """Transforms, materials, mesh stats, modifiers and light/camera data for one object.
 
-            for obj in subset:
-                obj_info = {
-                    "name": obj.name,
-                    "type": obj.type,
-                    "location": [round(float(obj.location.x), 3),
-                                 round(float(obj.location.y), 3),
-                                 round(float(obj.location.z), 3)],
-                    "rotation": [round(float(obj.rotation_euler.x), 3),
-                                 round(float(obj.rotation_euler.y), 3),
-                                 round(float(obj.rotation_euler.z), 3)],
-                    "scale": [round(float(obj.scale.x), 3),
-                              round(float(obj.scale.y), 3),
-                              round(float(obj.scale.z), 3)],
-                    "visible": obj.visible_get(),
-                    "materials": [],
-                    "modifiers": [],
-                }
+        bounding_box may be precomputed by a batched _get_aabbs call. fields
+        limits the record to those OBJECT_RECORD_FIELDS (name and type are
+        always present); the others are not computed at all.
+        """
+        def want(field):
+            return fields is None or field in fields
 
-                # Bounding box for mesh objects
-                if obj.type == "MESH":
-                    try:
-                        bounding_box = self._get_aabb(obj)
-                        obj_info["world_bounding_box"] = bounding_box
-                    except Exception:
-                        pass
-
-                # Material slots
-                for slot in obj.material_slots:
-                    if slot.material:
-                        obj_info["materials"].append(slot.material.name)
-
-                # Mesh stats
-                if obj.type == 'MESH' and obj.data:
-                    mesh = obj.data
-                    obj_info["mesh"] = {
-                        "vertices": len(mesh.vertices),
-                        "edges": len(mesh.edges),
-                        "polygons": len(mesh.polygons),
-                    }
+        obj_info = {
+            "name": obj.name,
+            "type": obj.type,
+        }
+        if want("location"):
+            obj_info["location"] = [round(float(obj.location.x), 3),
+                                    round(float(obj.location.y), 3),
+                                    round(float(obj.location.z), 3)]
+        if want("rotation"):
+            obj_info["rotation"] = [round(float(obj.rotation_euler.x), 3),
+                                    round(float(obj.rotation_euler.y), 3),
+                                    round(float(obj.rotation_euler.z), 3)]
+        if want("scale"):
+            obj_info["scale"] = [round(float(obj.scale.x), 3),
+                                 round(float(obj.scale.y), 3),
+                                 round(float(obj.scale.z), 3)]
+        if want("visible"):
+            obj_info["visible"] = obj.visible_get()
+
+        # Bounding box for mesh objects
+        if obj.type == "MESH" and want("world_bounding_box"):
+            try:
+                obj_info["world_bounding_box"] = bounding_box or self._get_aabb(obj)
+            except Exception:
+                pass
 
-                # Modifiers
-                for mod in obj.modifiers:
-                    obj_info["modifiers"].append({
-                        "name": mod.name,
-                        "type": mod.type,
-                    })
+        # Material slots
+        if want("materials"):
+            obj_info["materials"] = [slot.material.name for slot in obj.material_slots if slot.material]
 
-                # Light-specific data
-                if obj.type == 'LIGHT' and obj.data:
-                    light = obj.data
-                    obj_info["light"] = {
-                        "type": light.type,
-                        "energy": round(float(light.energy), 2),
-                        "color": [round(float(light.color.r), 3),
-                                  round(float(light.color.g), 3),
-                                  round(float(light.color.b), 3)],
-                    }
+        # Mesh stats
+        if obj.type == 'MESH' and obj.data and want("mesh"):
+            mesh = obj.data
+            obj_info["mesh"] = {
+                "vertices": len(mesh.vertices),
+                "edges": len(mesh.edges),
+                "polygons": len(mesh.polygons),
+            }
 
-                # Camera-specific data
-                if obj.type == 'CAMERA' and obj.data:
-                    cam = obj.data
-                    obj_info["camera"] = {
-                        "type": cam.type,
-                        "lens": round(float(cam.lens), 2),
-                        "clip_start": round(float(cam.clip_start), 3),
-                        "clip_end": round(float(cam.clip_end), 2),
-                    }
+        # Modifiers
+        if want("modifiers"):
+            obj_info["modifiers"] = [{"name": mod.name, "type": mod.type} for mod in obj.modifiers]
+
+        # Light-specific data
+        if obj.type == 'LIGHT' and obj.data and want("light"):
+            light = obj.data
+            obj_info["light"] = {
+                "type": light.type,
+                "energy": round(float(light.energy), 2),
+                "color": [round(float(light.color.r), 3),
+                          round(float(light.color.g), 3),
+                          round(float(light.color.b), 3)],
+            }
+
+        # Camera-specific data
+        if obj.type == 'CAMERA' and obj.data and want("camera"):
+            cam = obj.data
+            obj_info["camera"] = {
+                "type": cam.type,
+                "lens": round(float(cam.lens), 2),
+                "clip_start": round(float(cam.clip_start), 3),
+                "clip_end": round(float(cam.clip_end), 2),
+            }
+
+        return obj_info
 
-                all_objects.append(obj_info)
+    def _cached_object_records(self, objects, fields=None):
+        """get_all_object_info records for objects; cache misses share one batched AABB pass.
 
-            print(f"Collected info for {len(all_objects)} objects (of {total_count} total)")
+        fields is a sorted tuple of OBJECT_RECORD_FIELDS or None for full
+        records. Projections are cut from a cached full record when there is
+        one, and are otherwise built and cached per field set.
+        """
+        tracker = self.scene_tracker
+        kind = "summary" if fields is None else ("summary", fields)
+
+        def from_full(obj):
+            return fields is not None and tracker.has_record(obj, "summary")
+
+        def project(record):
+            return {key: value for key, value in record.items()
+                    if key in ("name", "type") or key in fields}
+
+        missing = []
+        if fields is None or "world_bounding_box" in fields:
+            missing = [obj for obj in objects
+                       if obj.type == 'MESH' and not tracker.has_record(obj, kind) and not from_full(obj)]
+        try:
+            bounds = dict(zip((obj.as_pointer() for obj in missing), self._get_aabbs(missing)))
+        except Exception:
+            # Leave it to the per-object path, which tolerates individual failures
+            bounds = {}
+
+        def build(obj):
+            return self._build_object_record(obj, bounds.get(obj.as_pointer()), fields)
+
+        return [
+            project(tracker.cached_record(obj, "summary", build)) if from_full(obj)
+            else tracker.cached_record(obj, kind, build)
+            for obj in objects
+        ]
+
+    @staticmethod
+    def _filter_objects(objects, types=None, name_glob=None, collection=None):
+        """Objects matching every given filter, in their original order"""
+        if collection is not None:
+            coll = bpy.data.collections.get(collection)
+            if coll is None:
+                raise ValueError(f"Collection not found: {collection}")
+            # all_objects includes child collections
+            members = {obj.as_pointer() for obj in coll.all_objects}
+            objects = [obj for obj in objects if obj.as_pointer() in members]
+        if types:
+            wanted = {t.upper() for t in types}
+            objects = [obj for obj in objects if obj.type in wanted]
+        if name_glob:
+            objects = [obj for obj in objects if fnmatch.fnmatchcase(obj.name, name_glob)]
+        return objects
+
+    def get_all_object_info(self, max_objects=50, start_index=0, fields=None, types=None,
+                            name_glob=None, collection=None):
+        """Get detailed information about all objects in the scene.
+        Returns a list of object details including type, transforms, materials,
+        mesh stats, and modifiers for every object.
+        Supports pagination via max_objects and start_index.
+
+        Optional filters, applied before pagination:
+        - fields: subset of OBJECT_RECORD_FIELDS to include (name and type
+          are always returned); unrequested data is never computed
+        - types: object types to keep, e.g. ["MESH", "LIGHT"]
+        - name_glob: shell-style pattern matched against object names
+        - collection: only objects in this collection or its children"""
+        try:
+            logger.debug("Getting all object info...")
+            if fields is not None:
+                unknown = set(fields) - set(OBJECT_RECORD_FIELDS)
+                if unknown:
+                    raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}. "
+                                     f"Valid fields: {', '.join(OBJECT_RECORD_FIELDS)}")
+                fields = tuple(sorted(set(fields)))
+            scene = self._sync_scene_tracker()
+            all_scene_objects = list(scene.objects)
+            total_count = len(all_scene_objects)
+            matched = self._filter_objects(all_scene_objects, types, name_glob, collection)
+            subset = matched[start_index:start_index + max_objects]
+            all_objects = self._cached_object_records(subset, fields)
+
+            logger.debug("Collected info for %d objects (of %d total)", len(all_objects), total_count)
             return {
                 "object_count": len(all_objects),
                 "total_in_scene": total_count,
+                "total_matched": len(matched),
                 "start_index": start_index,
-                "has_more": start_index + max_objects < total_count,
+                "has_more": start_index + max_objects < len(matched),
                 "objects": all_objects,
             }
         except Exception as e:
-            print(f"Error in get_all_object_info: {str(e)}")
-            traceback.print_exc()
+            logger.exception("Error in get_all_object_info: %s", e)
             raise
 
+    def get_scene_delta(self, since_version=None):
+        """Objects added, changed or removed since a previous get_scene_delta call.
+
+        Pass the returned version back as since_version. Without one, or when
+        the tracker can no longer answer it (undo, file load, scene switch),
+        every object is returned with full=True and the client should replace
+        its copy. Records carry an "id" that stays stable across renames.
+        """
+        scene = self._sync_scene_tracker()
+        tracker = self.scene_tracker
+
+        def with_ids(objects):
+            records = self._cached_object_records(objects)
+            return [{"id": str(obj.as_pointer()), **record} for obj, record in zip(objects, records)]
+
+        if tracker.can_answer(since_version):
+            try:
+                added, changed, removed = tracker.delta(since_version)
+                return {
+                    "version": tracker.version,
+                    "full": False,
+                    "object_count": len(tracker.objects),
+                    "added": with_ids(added),
+                    "changed": with_ids(changed),
+                    "removed": removed,
+                }
+            except ReferenceError:
+                # An object was freed without a notification; fall back to a resync
+                logger.warning("Scene tracker held a freed object; resetting")
+                tracker.reset(scene)
+
+        return {
+            "version": tracker.version,
+            "full": True,
+            "object_count": len(tracker.objects),
+            "added": with_ids(list(scene.objects)),
+            "changed": [],
+            "removed": [],
+        }
+
+    def _synced_spatial_index(self):
+        """The spatial index, caught up with every depsgraph change so far"""
+        scene = self._sync_scene_tracker()
+        try:
+            self.spatial_index.sync(self.scene_tracker, self._get_aabbs)
+        except ReferenceError:
+            logger.warning("Spatial index held a freed object; rebuilding")
+            self.scene_tracker.reset(scene)
+            self.spatial_index.sync(self.scene_tracker, self._get_aabbs)
+        return self.spatial_index
+
+    def _spatial_entry(self, index, pointer, **extra):
+        lo, hi = index.bounds[pointer]
+        return {"name": index.objects[pointer].name, **extra,
+                "world_bounding_box": [[round(v, 4) for v in lo], [round(v, 4) for v in hi]]}
+
+    def query_objects_in_box(self, min_corner, max_corner, fully_inside=False):
+        """Objects whose world AABB intersects (or, with fully_inside, lies within) a box"""
+        try:
+            if len(min_corner) != 3 or len(max_corner) != 3:
+                return {"error": "min_corner and max_corner must be [x, y, z]"}
+            lo = [min(a, b) for a, b in zip(min_corner, max_corner)]
+            hi = [max(a, b) for a, b in zip(min_corner, max_corner)]
+            index = self._synced_spatial_index()
+            hits = index.query_box(lo, hi, fully_inside=bool(fully_inside))
+            objects = sorted((self._spatial_entry(index, p) for p in hits), key=lambda e: e["name"])
+            return {"count": len(objects), "objects": objects}
+        except Exception as e:
+            return {"error": f"Failed to query objects in box: {str(e)}"}
+
+    def nearest_objects(self, point, k=5, max_distance=None):
+        """The k objects closest to a point, measured to their world AABB"""
+        try:
+            if len(point) != 3:
+                return {"error": "point must be [x, y, z]"}
+            index = self._synced_spatial_index()
+            nearest = index.nearest(point, max(1, int(k)))
+            if max_distance is not None:
+                nearest = [(p, d) for p, d in nearest if d <= max_distance]
+            return {
+                "point": list(point),
+                "objects": [self._spatial_entry(index, p, distance=round(d, 4)) for p, d in nearest],
+            }
+        except Exception as e:
+            return {"error": f"Failed to find nearest objects: {str(e)}"}
+
+    def find_overlapping_objects(self, names=None, tolerance=0.0, max_pairs=200):
+        """Pairs of objects whose world AABBs intersect by more than tolerance on every axis.
+
+        names limits the check to pairs involving those objects; otherwise
+        the whole scene is checked using the grid, not pairwise.
+        """
+        try:
+            index = self._synced_spatial_index()
+            pointers = None
+            if names is not None:
+                pointers = []
+                for name in names:
+                    obj = bpy.data.objects.get(name)
+                    if obj is None:
+                        return {"error": f"Object not found: {name}"}
+                    pointers.append(obj.as_pointer())
+
+            pairs = []
+            truncated = False
+            for a, b, extents in index.overlaps(pointers, float(tolerance)):
+                if len(pairs) >= max_pairs:
+                    truncated = True
+                    break
+                pairs.append({
+                    "a": index.objects[a].name,
+                    "b": index.objects[b].name,
+                    "overlap": [round(e, 4) for e in extents],
+                })
+            return {"count": len(pairs), "truncated": truncated, "pairs": pairs}
+        except Exception as e:
+            return {"error": f"Failed to find overlapping objects: {str(e)}"}
+
     def get_viewport_screenshot(self, max_size=800, filepath=None, format="png"):
         """
         Capture a screenshot of the current 3D viewport.
@@ -477,18 +3138,19 @@ class BlenderMCPServer:
         Parameters:
         - max_size: Maximum size in pixels for the largest dimension of the image
         - filepath: Optional path to save the screenshot file. If None, returns
-                    the image as base64-encoded data directly.
+                    the image bytes directly.
         - format: Image format (png, jpg, etc.)
 
         Returns:
         - If filepath: {success, width, height, filepath}
-        - If no filepath: {image (base64), width, height, format}
-        """
-        import os
-        import tempfile
-        import base64
+        - If no filepath: {image, width, height, format}; image is base64 by
+          default, or a binary frame / hand-off file per the command's transfer
 
-        return_base64 = filepath is None
+        PNG captures render the viewport offscreen, read the pixels once,
+        downsample with NumPy and encode in memory; the disk is only touched
+        to write a caller-supplied filepath. Other formats, or sessions
+        without GPU access, go through screenshot_area and a temp file.
+        """
         try:
             # Find the active 3D viewport
             area = None
@@ -500,6 +3162,66 @@ class BlenderMCPServer:
             if not area:
                 return {"error": "No 3D viewport found"}
 
+            if format.lower() == "png":
+                try:
+                    pixels = self._capture_viewport_pixels(area)
+                except Exception as e:
+                    logger.debug("Offscreen viewport capture unavailable, using screenshot_area: %s", e)
+                    pixels = None
+                if pixels is not None:
+                    pixels = _downsample_pixels(pixels, max_size)
+                    height, width = pixels.shape[:2]
+                    png = _encode_png(pixels)
+                    if filepath:
+                        with open(filepath, "wb") as f:
+                            f.write(png)
+                        return {"success": True, "width": width, "height": height, "filepath": filepath}
+                    return {
+                        "image": BinaryPayload(png, mime="image/png", extension="png"),
+                        "width": width,
+                        "height": height,
+                        "format": format,
+                    }
+
+            return self._screenshot_area_via_disk(area, max_size, filepath, format)
+        except Exception as e:
+            return {"error": str(e)}
+
+    @staticmethod
+    def _capture_viewport_pixels(area):
+        """Draw the viewport into an offscreen buffer; returns top-down RGB uint8 pixels"""
+        import gpu
+
+        space = area.spaces.active
+        region = next(r for r in area.regions if r.type == 'WINDOW')
+        width, height = region.width, region.height
+        offscreen = gpu.types.GPUOffScreen(width, height)
+        try:
+            with offscreen.bind():
+                framebuffer = gpu.state.active_framebuffer_get()
+                framebuffer.clear(color=(0.0, 0.0, 0.0, 1.0))
+                offscreen.draw_view3d(
+                    bpy.context.scene,
+                    bpy.context.view_layer,
+                    space,
+                    region,
+                    space.region_3d.view_matrix,
+                    space.region_3d.window_matrix,
+                    do_color_management=True,
+                )
+                buffer = framebuffer.read_color(0, 0, width, height, 4, 0, 'UBYTE')
+        finally:
+            offscreen.free()
+
+        # GPU rows are bottom-up; drop alpha since the viewport is opaque
+        pixels = np.asarray(buffer, dtype=np.uint8).reshape(height, width, 4)
+        return np.ascontiguousarray(pixels[::-1, :, :3])
+
+    @staticmethod
+    def _screenshot_area_via_disk(area, max_size, filepath, format):
+        """Fallback capture through screenshot_area and Blender's image I/O"""
+        return_base64 = filepath is None
+        try:
             # Determine file path — use temp if none provided
             if return_base64:
                 tmp = tempfile.NamedTemporaryFile(suffix=f".{format}", delete=False)
@@ -529,9 +3251,9 @@ class BlenderMCPServer:
             bpy.data.images.remove(img)
 
             if return_base64:
-                # Read the file and encode as base64
+                # Read the file; the transport encodes it per the requested transfer
                 with open(filepath, "rb") as f:
-                    image_data = base64.b64encode(f.read()).decode("utf-8")
+                    image_data = BinaryPayload(f.read(), mime=_image_mime(format), extension=format)
                 # Clean up temp file
                 try:
                     os.remove(filepath)
@@ -560,23 +3282,152 @@ class BlenderMCPServer:
                     pass
             return {"error": str(e)}
 
-    def execute_code(self, code):
-        """Execute arbitrary Blender Python code"""
+    def execute_code(self, code=None, namespace=None, code_hash=None, sandbox=False,
+                     timeout=SANDBOX_TIMEOUT, apply=False, as_job=False, notify=False):
+        """Execute arbitrary Blender Python code.
+
+        Compiled code is cached by the sha256 of its source, returned as
+        code_hash; pass code_hash instead of code to re-run a snippet without
+        sending it again. With namespace="name" the globals persist under that
+        name, so helpers defined once are visible to later snippets.
+
+        With sandbox=True the code runs in a separate `blender --background`
+        on a copy of the current file and is killed after timeout seconds.
+        The live scene is left alone unless apply=True and the sandbox run
+        succeeded. Sandbox runs need as_job=True and return a job handle:
+        waiting for the subprocess here would freeze Blender's UI. Several
+        sandbox runs can proceed in parallel.
+        """
+        if sandbox:
+            return self._execute_code_sandboxed(code, timeout, apply, as_job, notify)
         # This is powerful but potentially dangerous - use with caution
         try:
-            # Create a local namespace for execution
-            namespace = {"bpy": bpy}
+            if code is not None:
+                code_hash, compiled = self._compile_code(code)
+            else:
+                compiled = self.code_cache.get(code_hash) if code_hash else None
+                if compiled is None:
+                    raise ValueError(f"No cached code for hash {code_hash!r}; send the source as code")
+                self.code_cache.move_to_end(code_hash)
+
+            # Fresh globals unless a persistent namespace was requested
+            globals_ = self._code_namespace(namespace) if namespace else {"bpy": bpy}
 
             # Capture stdout during execution, and return it as result
             capture_buffer = io.StringIO()
-            with redirect_stdout(capture_buffer):
-                exec(code, namespace)
+            trace, self._line_trace = self._code_trace()
+            self._code_thread = threading.get_ident()
+            deadline_timer = None
+            if trace is not None and self._current_deadline is not None:
+                deadline_timer = threading.Timer(
+                    max(0.0, self._current_deadline - time.perf_counter()), self._trace_running_snippet)
+                deadline_timer.daemon = True
+            previous_trace = sys.gettrace()
+            try:
+                with redirect_stdout(capture_buffer):
+                    if trace is not None:
+                        sys.settrace(trace)
+                    if deadline_timer is not None:
+                        deadline_timer.start()
+                    exec(compiled, globals_)
+            finally:
+                if deadline_timer is not None:
+                    deadline_timer.cancel()
+                self._line_trace = None
+                self._code_thread = None
+                if trace is not None:
+                    sys.settrace(previous_trace)
 
             captured_output = capture_buffer.getvalue()
-            return {"executed": True, "result": captured_output}
+            return {"executed": True, "result": captured_output, "code_hash": code_hash}
+        except CommandInterrupted as e:
+            raise Exception(f"Code execution {e}; output so far: {capture_buffer.getvalue()!r}")
         except Exception as e:
             raise Exception(f"Code execution error: {str(e)}")
 
+    def _execute_code_sandboxed(self, code, timeout, apply, as_job, notify):
+        if code is None:
+            return {"error": "Sandbox runs need the source in code"}
+        if not as_job:
+            return {"error": "Sandbox runs need as_job=True; poll get_job_status for the result"}
+        if not bpy.app.binary_path:
+            return {"error": "Sandbox needs the Blender executable, which this session doesn't have"}
+        timeout = min(max(float(timeout), 1.0), SANDBOX_MAX_TIMEOUT)
+
+        # The snapshot has to be written here, on the main thread
+        temp_dir = tempfile.mkdtemp(prefix="modelforge-sandbox-")
+        snapshot_path = os.path.join(temp_dir, "scene.blend")
+        code_path = os.path.join(temp_dir, "code.py")
+        runner_path = os.path.join(temp_dir, "runner.py")
+        result_path = os.path.join(temp_dir, "result.json")
+        try:
+            bpy.ops.wm.save_as_mainfile(filepath=snapshot_path, copy=True, check_existing=False)
+            for path, text in ((code_path, code), (runner_path, SANDBOX_RUNNER)):
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+        except Exception as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            return {"error": f"Could not snapshot the file for the sandbox: {str(e)}"}
+
+        # --factory-startup keeps the user's startup file and addons (this one
+        # included) out of the sandbox
+        args = [bpy.app.binary_path, "--background", "--factory-startup", snapshot_path,
+                "--python", runner_path, "--", code_path, result_path]
+
+        def fetch(job):
+            return _run_sandbox(job, args, temp_dir, result_path, timeout)
+
+        def finish(job, fetched):
+            result = fetched["result"]
+            result["applied"] = False
+            if apply:
+                live = self.execute_code(code)
+                result.update(applied=True, live_result=live["result"], code_hash=live["code_hash"])
+            return result
+
+        return self._start_job("execute_code", fetch, finish, notify)
+
+    def _compile_code(self, code):
+        """(hash, code object) for source, compiling only on a cache miss"""
+        code_hash = hashlib.sha256(code.encode("utf-8")).hexdigest()
+        compiled = self.code_cache.get(code_hash)
+        if compiled is not None:
+            self.code_cache.move_to_end(code_hash)
+            return code_hash, compiled
+        compiled = compile(code, f"<execute_code {code_hash[:12]}>", "exec")
+        self.code_cache[code_hash] = compiled
+        if len(self.code_cache) > CODE_CACHE_SIZE:
+            self.code_cache.popitem(last=False)
+        return code_hash, compiled
+
+    def _code_namespace(self, name):
+        namespace = self.code_namespaces.get(name)
+        if namespace is None:
+            if len(self.code_namespaces) >= MAX_CODE_NAMESPACES:
+                raise ValueError(f"Too many code namespaces ({MAX_CODE_NAMESPACES}); "
+                                 f"free one with drop_code_namespace")
+            namespace = self.code_namespaces[name] = {"bpy": bpy}
+        return namespace
+
+    def list_code_namespaces(self):
+        """Persistent execute_code namespaces and the names defined in each"""
+        namespaces = []
+        for name, namespace in self.code_namespaces.items():
+            defined = sorted(key for key in namespace if key != "bpy" and not key.startswith("__"))
+            namespaces.append({"name": name, "names": defined})
+        return {"namespaces": namespaces, "cached_code": len(self.code_cache)}
+
+    def drop_code_namespace(self, name=None):
+        """Discard one persistent namespace, or all of them when name is omitted"""
+        if name is None:
+            dropped = list(self.code_namespaces)
+            self.code_namespaces.clear()
+        elif self.code_namespaces.pop(name, None) is not None:
+            dropped = [name]
+        else:
+            return {"error": f"Unknown code namespace: {name}"}
+        return {"success": True, "dropped": dropped}
+
     def list_materials(self):
         """List all materials in the .blend file with their node counts and linked objects"""
         try:
@@ -690,6 +3541,8 @@ class BlenderMCPServer:
             # Also rename the data block if it matches the old name
             if obj.data and obj.data.name == old_name:
                 obj.data.name = new_name
+            # Renames don't always reach the depsgraph
+            self.scene_tracker.record(bpy.context.scene, [obj])
 
             return {
                 "success": True,
@@ -1016,6 +3869,8 @@ class BlenderMCPServer:
 
             if not changes:
                 return {"error": "Provide hide_viewport and/or hide_render"}
+            # Keep cached info records in step with the new visibility
+            self.scene_tracker.record(bpy.context.scene, [obj])
 
             return {
                 "success": True,
@@ -1027,10 +3882,39 @@ class BlenderMCPServer:
         except Exception as e:
             return {"error": f"Failed to set visibility: {str(e)}"}
 
-    def export_object(self, names, filepath, file_format='GLB'):
-        """Export selected objects to a file. Supports GLB, GLTF, FBX, OBJ, STL."""
+    def export_object(self, names, filepath=None, file_format='GLB', return_data=False,
+                      as_job=False, notify=False):
+        """Export objects to a file; with as_job=True, as a background job.
+
+        A job returns {"job_id", ...} immediately and exports on a later
+        timer tick; poll get_job_status or pass notify=True for pushes.
+        """
+        if as_job:
+            return self._start_job(
+                "export_object", None,
+                lambda job, _: self._export_objects(names, filepath, file_format, return_data),
+                notify,
+            )
+        return self._export_objects(names, filepath, file_format, return_data)
+
+    def _export_objects(self, names, filepath=None, file_format='GLB', return_data=False):
+        """Export selected objects to a file. Supports GLB, GLTF, FBX, OBJ, STL.
+
+        With return_data=True the exported bytes are returned in "data" (sent
+        per the command's transfer mode); filepath may then be omitted to
+        export through a temporary file.
+        """
+        temp_dir = None
         try:
-            import os
+            fmt = file_format.upper()
+            if return_data and fmt == 'GLTF':
+                return {"error": "return_data needs a single-file format: GLB, FBX, OBJ or STL"}
+            if not filepath:
+                if not return_data:
+                    return {"error": "Provide a filepath or set return_data=true"}
+                temp_dir = tempfile.mkdtemp(prefix="modelforge-export-")
+                filepath = os.path.join(temp_dir, f"export.{fmt.lower()}")
+
             # Validate objects
             objects = []
             for n in (names if isinstance(names, list) else [names]):
@@ -1045,7 +3929,6 @@ class BlenderMCPServer:
                 obj.select_set(True)
             bpy.context.view_layer.objects.active = objects[0]
 
-            fmt = file_format.upper()
             if fmt in ('GLB', 'GLTF'):
                 export_format = 'GLB' if fmt == 'GLB' else 'GLTF_SEPARATE'
                 bpy.ops.export_scene.gltf(
@@ -1072,15 +3955,24 @@ class BlenderMCPServer:
                 return {"error": f"Unsupported format: {file_format}. Use GLB, GLTF, FBX, OBJ, or STL."}
 
             file_size = os.path.getsize(filepath) if os.path.exists(filepath) else 0
-            return {
+            result = {
                 "success": True,
                 "exported_objects": [o.name for o in objects],
-                "filepath": filepath,
+                "filepath": None if temp_dir else filepath,
                 "format": fmt,
                 "file_size_bytes": file_size,
             }
+            if return_data:
+                mime = "model/gltf-binary" if fmt == 'GLB' else "application/octet-stream"
+                with open(filepath, "rb") as f:
+                    result["data"] = BinaryPayload(f.read(), mime=mime, extension=fmt.lower())
+            return result
         except Exception as e:
             return {"error": f"Failed to export: {str(e)}"}
+        finally:
+            if temp_dir:
+                with suppress(Exception):
+                    shutil.rmtree(temp_dir)
 
     # ---------- Phase 3: Dynamic Addon Detection ----------
 
@@ -1384,27 +4276,70 @@ class BlenderMCPServer:
         except Exception as e:
             return {"error": f"Failed to set render settings: {str(e)}"}
 
-    def render_image(self, output_path=None, file_format=None, open_after=False):
-        """Render the current scene and optionally save to a file. Returns the output path."""
+    def render_image(self, output_path=None, file_format=None, open_after=False, as_job=False, notify=False):
+        """Render the current scene and optionally save to a file. Returns the output path.
+
+        With as_job=True the render is started with INVOKE_DEFAULT, so Blender
+        stays responsive while it runs, and a job handle is returned; the job
+        completes from the render_complete / render_cancel handlers.
+        """
+        if as_job:
+            return self._start_job(
+                "render_image", None,
+                lambda job, _: self._start_render(job, output_path, file_format),
+                notify,
+            )
         try:
-            scene = bpy.context.scene
+            scene = self._apply_render_output(output_path, file_format)
+            bpy.ops.render.render(write_still=True)
+            return self._render_result(scene)
+        except Exception as e:
+            return {"error": f"Failed to render: {str(e)}"}
 
-            if output_path:
-                scene.render.filepath = output_path
-            if file_format:
-                scene.render.image_settings.file_format = file_format.upper()
+    @staticmethod
+    def _apply_render_output(output_path, file_format):
+        scene = bpy.context.scene
+        if output_path:
+            scene.render.filepath = output_path
+        if file_format:
+            scene.render.image_settings.file_format = file_format.upper()
+        return scene
+
+    @staticmethod
+    def _render_result(scene):
+        return {
+            "success": True,
+            "output_path": bpy.path.abspath(scene.render.filepath),
+            "engine": scene.render.engine,
+            "resolution": f"{scene.render.resolution_x}x{scene.render.resolution_y}",
+            "file_format": scene.render.image_settings.file_format,
+        }
+
+    def _start_render(self, job, output_path, file_format):
+        """Main-thread phase of a render job: kick off a non-blocking render"""
+        if bpy.app.is_job_running('RENDER'):
+            return {"error": "A render is already running"}
+        scene = self._apply_render_output(output_path, file_format)
+        result = self._render_result(scene)
 
+        windows = bpy.context.window_manager.windows if not bpy.app.background else ()
+        if not windows:
+            # No UI to host a modal render; render in place
             bpy.ops.render.render(write_still=True)
+            return result
 
-            return {
-                "success": True,
-                "output_path": bpy.path.abspath(scene.render.filepath),
-                "engine": scene.render.engine,
-                "resolution": f"{scene.render.resolution_x}x{scene.render.resolution_y}",
-                "file_format": scene.render.image_settings.file_format,
-            }
-        except Exception as e:
-            return {"error": f"Failed to render: {str(e)}"}
+        self.jobs.await_render(job, result)
+        try:
+            with bpy.context.temp_override(window=windows[0]):
+                status = bpy.ops.render.render('INVOKE_DEFAULT', write_still=True)
+        except Exception:
+            self.jobs.await_render(None, None)
+            raise
+        if 'RUNNING_MODAL' not in status:
+            self.jobs.await_render(None, None)
+            return result if 'FINISHED' in status else {"error": f"Render did not start: {status}"}
+        job.report("Rendering")
+        return JOB_PENDING
 
     def get_polyhaven_categories(self, asset_type):
         """Get categories for a specific asset type from Polyhaven"""
@@ -1412,7 +4347,8 @@ class BlenderMCPServer:
             if asset_type not in ["hdris", "textures", "models", "all"]:
                 return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
 
-            response = requests.get(f"https://api.polyhaven.com/categories/{asset_type}", headers=REQ_HEADERS)
+            response = requests.get(f"https://api.polyhaven.com/categories/{asset_type}", headers=REQ_HEADERS,
+                                    timeout=30)
             if response.status_code == 200:
                 return {"categories": response.json()}
             else:
@@ -1434,7 +4370,7 @@ class BlenderMCPServer:
             if categories:
                 params["categories"] = categories
 
-            response = requests.get(url, params=params, headers=REQ_HEADERS)
+            response = requests.get(url, params=params, headers=REQ_HEADERS, timeout=30)
             if response.status_code == 200:
                 # Limit the response size to avoid overwhelming Blender
                 assets = response.json()
@@ -1451,328 +4387,364 @@ class BlenderMCPServer:
         except Exception as e:
             return {"error": str(e)}
 
-    def download_polyhaven_asset(self, asset_id, asset_type, resolution="1k", file_format=None):
+    def download_polyhaven_asset(self, asset_id, asset_type, resolution="1k", file_format=None,
+                                 as_job=False, notify=False):
+        """Download a Poly Haven HDRI, texture set or model and bring it into the scene.
+
+        With as_job=True the files download on a worker thread (with progress
+        and cancellation) and only the import runs on the main thread; a job
+        handle is returned immediately.
+        """
+        def fetch(job):
+            return self._fetch_polyhaven_asset(job, asset_id, asset_type, resolution, file_format)
+
+        if as_job:
+            return self._start_job("download_polyhaven_asset", fetch, self._import_polyhaven_asset, notify)
+        try:
+            return self._run_phases(fetch, self._import_polyhaven_asset)
+        except Exception as e:
+            return {"error": f"Failed to download asset: {str(e)}"}
+
+    def _fetch_polyhaven_asset(self, job, asset_id, asset_type, resolution, file_format):
+        """Network phase: gather the asset's files into a temporary directory.
+
+        Files come from the persistent asset cache when it has them; a repeat
+        request for the same asset, resolution and format makes no requests.
+        """
+        if not file_format:
+            # Defaults per asset type
+            file_format = {"hdris": "hdr", "textures": "jpg", "models": "gltf"}.get(asset_type)
+        cache_bytes = self.settings.get("asset_cache_mb", 0) * 1024 * 1024
+        cache_key = (asset_type, asset_id, resolution, file_format)
+
+        entries = self.asset_cache.load_manifest(cache_key) if cache_bytes else None
+        if entries is None:
+            entries = self._polyhaven_file_entries(asset_id, asset_type, resolution, file_format)
+            if isinstance(entries, dict):
+                return entries
+
+        temp_dir = tempfile.mkdtemp(prefix="modelforge-polyhaven-")
+        fetched = {"asset_id": asset_id, "asset_type": asset_type, "file_format": file_format,
+                   "temp_dir": temp_dir, "files": {}, "cached_files": 0}
+        downloaded = False
         try:
-            # First get the files information
-            files_response = requests.get(f"https://api.polyhaven.com/files/{asset_id}", headers=REQ_HEADERS)
-            if files_response.status_code != 200:
-                return {"error": f"Failed to get asset files: {files_response.status_code}"}
+            for entry in entries:
+                relative_path = entry["path"]
+                path = os.path.normpath(os.path.join(temp_dir, relative_path))
+                if not path.startswith(os.path.abspath(temp_dir)):
+                    raise ValueError(f"Refusing to write outside the download directory: {relative_path}")
+                if cache_bytes and self.asset_cache.materialize(entry["digest"], path):
+                    fetched["files"][entry["key"]] = path
+                    fetched["cached_files"] += 1
+                    continue
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                status = _download_file(entry["url"], path, job, headers=REQ_HEADERS)
+                if status == 200:
+                    fetched["files"][entry["key"]] = path
+                    if cache_bytes and (entry["md5"] is None or _file_md5(path) == entry["md5"]):
+                        self.asset_cache.store(entry["digest"], path)
+                        downloaded = True
+                elif entry["required"]:
+                    return {"error": f"Failed to download {entry['required']}: {status}", "temp_dir": temp_dir}
+                else:
+                    logger.warning("Failed to download %s: %s", relative_path, status)
+        except BaseException:
+            with suppress(Exception):
+                shutil.rmtree(temp_dir)
+            raise
+        if asset_type == "textures" and not fetched["files"]:
+            return {"error": f"No texture maps found for the requested resolution and format", "temp_dir": temp_dir}
+
+        if cache_bytes and len(fetched["files"]) == len(entries):
+            try:
+                self.asset_cache.save_manifest(cache_key, entries)
+                if downloaded:
+                    self.asset_cache.evict(cache_bytes)
+            except OSError as e:
+                logger.warning("Could not update the asset cache: %s", e)
+        return fetched
+
+    @staticmethod
+    def _polyhaven_file_entries(asset_id, asset_type, resolution, file_format):
+        """Files making up an asset per api.polyhaven.com, or an error dict.
+
+        Each entry: key, url, path relative to the download directory, md5
+        (None if the API gave none), cache digest and, for files the import
+        can't do without, a label for the error message.
+        """
+        # First get the files information
+        files_response = requests.get(f"https://api.polyhaven.com/files/{asset_id}", headers=REQ_HEADERS,
+                                      timeout=30)
+        if files_response.status_code != 200:
+            return {"error": f"Failed to get asset files: {files_response.status_code}"}
+
+        files_data = files_response.json()
+
+        # (key, file info, path relative to the temp dir, required)
+        downloads = []
+        if asset_type == "hdris":
+            # For HDRIs, download the .hdr or .exr file
+            if not ("hdri" in files_data and resolution in files_data["hdri"]
+                    and file_format in files_data["hdri"][resolution]):
+                return {"error": f"Requested resolution or format not available for this HDRI"}
+            downloads.append(("hdri", files_data["hdri"][resolution][file_format],
+                              f"{asset_id}.{file_format}", "HDRI"))
+
+        elif asset_type == "textures":
+            for map_type, formats in files_data.items():
+                if map_type not in ["blend", "gltf"]:  # Skip non-texture files
+                    if resolution in formats and file_format in formats[resolution]:
+                        downloads.append((map_type, formats[resolution][file_format],
+                                          f"{asset_id}_{map_type}.{file_format}", None))
+            if not downloads:
+                return {"error": f"No texture maps found for the requested resolution and format"}
+
+        elif asset_type == "models":
+            # For models, prefer glTF format if available
+            if not (file_format in files_data and resolution in files_data[file_format]):
+                return {"error": f"Requested format or resolution not available for this model"}
+            file_info = files_data[file_format][resolution][file_format]
+            downloads.append(("main", file_info, file_info["url"].split("/")[-1], "model"))
+            # Included files (textures, .bin buffers) keep their relative paths
+            for include_path, include_info in (file_info.get("include") or {}).items():
+                downloads.append((include_path, include_info, include_path, None))
+
+        else:
+            return {"error": f"Unsupported asset type: {asset_type}"}
+
+        entries = []
+        for key, info, relative_path, required in downloads:
+            md5 = info.get("md5")
+            entries.append({
+                "key": key,
+                "url": info["url"],
+                "path": relative_path,
+                "md5": md5,
+                # Content address; without a checksum the URL stands in for one
+                "digest": md5 or "url-" + hashlib.sha256(info["url"].encode("utf-8")).hexdigest(),
+                "required": required,
+            })
+        return entries
+
+    def clear_polyhaven_cache(self):
+        """Delete every cached Poly Haven download"""
+        self.asset_cache.clear()
+        return {"success": True, "cache_dir": self.asset_cache.root}
+
+    def _import_polyhaven_asset(self, job, fetched):
+        """Main-thread phase: load fetched Poly Haven files into the scene"""
+        asset_id = fetched["asset_id"]
+        asset_type = fetched["asset_type"]
+        file_format = fetched["file_format"]
+        files = fetched["files"]
+
+        if asset_type == "hdris":
+            tmp_path = files["hdri"]
+            try:
+                # Create a new world if none exists
+                if not bpy.data.worlds:
+                    bpy.data.worlds.new("World")
 
-            files_data = files_response.json()
+                world = bpy.data.worlds[0]
+                node_tree = world.node_tree
 
-            # Handle different asset types
-            if asset_type == "hdris":
-                # For HDRIs, download the .hdr or .exr file
-                if not file_format:
-                    file_format = "hdr"  # Default format for HDRIs
+                # Clear existing nodes
+                for node in node_tree.nodes:
+                    node_tree.nodes.remove(node)
 
-                if "hdri" in files_data and resolution in files_data["hdri"] and file_format in files_data["hdri"][resolution]:
-                    file_info = files_data["hdri"][resolution][file_format]
-                    file_url = file_info["url"]
+                # Create nodes
+                tex_coord = node_tree.nodes.new(type='ShaderNodeTexCoord')
+                tex_coord.location = (-800, 0)
 
-                    # For HDRIs, we need to save to a temporary file first
-                    # since Blender can't properly load HDR data directly from memory
-                    with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                        # Download the file
-                        response = requests.get(file_url, headers=REQ_HEADERS)
-                        if response.status_code != 200:
-                            return {"error": f"Failed to download HDRI: {response.status_code}"}
+                mapping = node_tree.nodes.new(type='ShaderNodeMapping')
+                mapping.location = (-600, 0)
 
-                        tmp_file.write(response.content)
-                        tmp_path = tmp_file.name
+                # Load the image from the temporary file
+                env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
+                env_tex.location = (-400, 0)
+                env_tex.image = bpy.data.images.load(tmp_path)
 
+                # Use a color space that exists in all Blender versions
+                if file_format.lower() == 'exr':
+                    # Try to use Linear color space for EXR files
                     try:
-                        # Create a new world if none exists
-                        if not bpy.data.worlds:
-                            bpy.data.worlds.new("World")
-
-                        world = bpy.data.worlds[0]
-                        node_tree = world.node_tree
-
-                        # Clear existing nodes
-                        for node in node_tree.nodes:
-                            node_tree.nodes.remove(node)
-
-                        # Create nodes
-                        tex_coord = node_tree.nodes.new(type='ShaderNodeTexCoord')
-                        tex_coord.location = (-800, 0)
-
-                        mapping = node_tree.nodes.new(type='ShaderNodeMapping')
-                        mapping.location = (-600, 0)
-
-                        # Load the image from the temporary file
-                        env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
-                        env_tex.location = (-400, 0)
-                        env_tex.image = bpy.data.images.load(tmp_path)
-
-                        # Use a color space that exists in all Blender versions
-                        if file_format.lower() == 'exr':
-                            # Try to use Linear color space for EXR files
-                            try:
-                                env_tex.image.colorspace_settings.name = 'Linear'
-                            except:
-                                # Fallback to Non-Color if Linear isn't available
-                                env_tex.image.colorspace_settings.name = 'Non-Color'
-                        else:  # hdr
-                            # For HDR files, try these options in order
-                            for color_space in ['Linear', 'Linear Rec.709', 'Non-Color']:
-                                try:
-                                    env_tex.image.colorspace_settings.name = color_space
-                                    break  # Stop if we successfully set a color space
-                                except:
-                                    continue
-
-                        background = node_tree.nodes.new(type='ShaderNodeBackground')
-                        background.location = (-200, 0)
-
-                        output = node_tree.nodes.new(type='ShaderNodeOutputWorld')
-                        output.location = (0, 0)
-
-                        # Connect nodes
-                        node_tree.links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
-                        node_tree.links.new(mapping.outputs['Vector'], env_tex.inputs['Vector'])
-                        node_tree.links.new(env_tex.outputs['Color'], background.inputs['Color'])
-                        node_tree.links.new(background.outputs['Background'], output.inputs['Surface'])
-
-                        # Set as active world
-                        bpy.context.scene.world = world
-
-                        # Clean up temporary file
+                        env_tex.image.colorspace_settings.name = 'Linear'
+                    except:
+                        # Fallback to Non-Color if Linear isn't available
+                        env_tex.image.colorspace_settings.name = 'Non-Color'
+                else:  # hdr
+                    # For HDR files, try these options in order
+                    for color_space in ['Linear', 'Linear Rec.709', 'Non-Color']:
                         try:
-                            if tmp_path and os.path.isfile(tmp_path):
-                                os.remove(tmp_path)
-                        except OSError:
-                            pass
+                            env_tex.image.colorspace_settings.name = color_space
+                            break  # Stop if we successfully set a color space
+                        except:
+                            continue
 
-                        return {
-                            "success": True,
-                            "message": f"HDRI {asset_id} imported successfully",
-                            "image_name": env_tex.image.name
-                        }
-                    except Exception as e:
-                        return {"error": f"Failed to set up HDRI in Blender: {str(e)}"}
-                else:
-                    return {"error": f"Requested resolution or format not available for this HDRI"}
+                background = node_tree.nodes.new(type='ShaderNodeBackground')
+                background.location = (-200, 0)
 
-            elif asset_type == "textures":
-                if not file_format:
-                    file_format = "jpg"  # Default format for textures
+                output = node_tree.nodes.new(type='ShaderNodeOutputWorld')
+                output.location = (0, 0)
 
-                downloaded_maps = {}
+                # Connect nodes
+                node_tree.links.new(tex_coord.outputs['Generated'], mapping.inputs['Vector'])
+                node_tree.links.new(mapping.outputs['Vector'], env_tex.inputs['Vector'])
+                node_tree.links.new(env_tex.outputs['Color'], background.inputs['Color'])
+                node_tree.links.new(background.outputs['Background'], output.inputs['Surface'])
 
-                try:
-                    for map_type in files_data:
-                        if map_type not in ["blend", "gltf"]:  # Skip non-texture files
-                            if resolution in files_data[map_type] and file_format in files_data[map_type][resolution]:
-                                file_info = files_data[map_type][resolution][file_format]
-                                file_url = file_info["url"]
-
-                                # Use NamedTemporaryFile like we do for HDRIs
-                                with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                                    # Download the file
-                                    response = requests.get(file_url, headers=REQ_HEADERS)
-                                    if response.status_code == 200:
-                                        tmp_file.write(response.content)
-                                        tmp_path = tmp_file.name
-
-                                        # Load image from temporary file
-                                        image = bpy.data.images.load(tmp_path)
-                                        image.name = f"{asset_id}_{map_type}.{file_format}"
-
-                                        # Pack the image into .blend file
-                                        image.pack()
-
-                                        # Set color space based on map type
-                                        if map_type in ['color', 'diffuse', 'albedo']:
-                                            try:
-                                                image.colorspace_settings.name = 'sRGB'
-                                            except:
-                                                pass
-                                        else:
-                                            try:
-                                                image.colorspace_settings.name = 'Non-Color'
-                                            except:
-                                                pass
-
-                                        downloaded_maps[map_type] = image
-
-                                        # Clean up temporary file
-                                        try:
-                                            os.unlink(tmp_path)
-                                        except:
-                                            pass
-
-                    if not downloaded_maps:
-                        return {"error": f"No texture maps found for the requested resolution and format"}
-
-                    # Create a new material with the downloaded textures
-                    mat = bpy.data.materials.new(name=asset_id)
-                    mat.use_nodes = True # Fix #8: Add use_nodes=True safety check
-                    nodes = mat.node_tree.nodes
-                    links = mat.node_tree.links
-
-                    # Clear default nodes
-                    for node in nodes:
-                        nodes.remove(node)
-
-                    # Create output node
-                    output = nodes.new(type='ShaderNodeOutputMaterial')
-                    output.location = (300, 0)
-
-                    # Create principled BSDF node
-                    principled = nodes.new(type='ShaderNodeBsdfPrincipled')
-                    principled.location = (0, 0)
-                    links.new(principled.outputs[0], output.inputs[0])
-
-                    # Add texture nodes based on available maps
-                    tex_coord = nodes.new(type='ShaderNodeTexCoord')
-                    tex_coord.location = (-800, 0)
-
-                    mapping = nodes.new(type='ShaderNodeMapping')
-                    mapping.location = (-600, 0)
-                    mapping.vector_type = 'TEXTURE'  # Changed from default 'POINT' to 'TEXTURE'
-                    links.new(tex_coord.outputs['UV'], mapping.inputs['Vector'])
-
-                    # Position offset for texture nodes
-                    x_pos = -400
-                    y_pos = 300
-
-                    # Connect different texture maps
-                    for map_type, image in downloaded_maps.items():
-                        tex_node = nodes.new(type='ShaderNodeTexImage')
-                        tex_node.location = (x_pos, y_pos)
-                        tex_node.image = image
-
-                        # Set color space based on map type
-                        if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                            try:
-                                tex_node.image.colorspace_settings.name = 'sRGB'
-                            except:
-                                pass  # Use default if sRGB not available
-                        else:
-                            try:
-                                tex_node.image.colorspace_settings.name = 'Non-Color'
-                            except:
-                                pass  # Use default if Non-Color not available
-
-                        links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
-
-                        # Connect to appropriate input on Principled BSDF
-                        if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Base Color'])
-                        elif map_type.lower() in ['roughness', 'rough']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Roughness'])
-                        elif map_type.lower() in ['metallic', 'metalness', 'metal']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Metallic'])
-                        elif map_type.lower() in ['normal', 'nor']:
-                            # Add normal map node
-                            normal_map = nodes.new(type='ShaderNodeNormalMap')
-                            normal_map.location = (x_pos + 200, y_pos)
-                            links.new(tex_node.outputs['Color'], normal_map.inputs['Color'])
-                            links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
-                        elif map_type in ['displacement', 'disp', 'height']:
-                            # Add displacement node
-                            disp_node = nodes.new(type='ShaderNodeDisplacement')
-                            disp_node.location = (x_pos + 200, y_pos - 200)
-                            links.new(tex_node.outputs['Color'], disp_node.inputs['Height'])
-                            links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
-
-                        y_pos -= 250
+                # Set as active world
+                bpy.context.scene.world = world
 
-                    return {
-                        "success": True,
-                        "message": f"Texture {asset_id} imported as material",
-                        "material": mat.name,
-                        "maps": list(downloaded_maps.keys())
-                    }
+                return {
+                    "success": True,
+                    "message": f"HDRI {asset_id} imported successfully",
+                    "image_name": env_tex.image.name
+                }
+            except Exception as e:
+                return {"error": f"Failed to set up HDRI in Blender: {str(e)}"}
 
-                except Exception as e:
-                    return {"error": f"Failed to process textures: {str(e)}"}
+        elif asset_type == "textures":
+            downloaded_maps = {}
+
+            try:
+                for map_type, tmp_path in files.items():
+                    # Load image from the downloaded file
+                    image = bpy.data.images.load(tmp_path)
+                    image.name = f"{asset_id}_{map_type}.{file_format}"
+
+                    # Pack the image into .blend file
+                    image.pack()
+
+                    # Set color space based on map type
+                    if map_type in ['color', 'diffuse', 'albedo']:
+                        try:
+                            image.colorspace_settings.name = 'sRGB'
+                        except:
+                            pass
+                    else:
+                        try:
+                            image.colorspace_settings.name = 'Non-Color'
+                        except:
+                            pass
+                    downloaded_maps[map_type] = image
+
+                # Create a new material with the downloaded textures
+                mat = bpy.data.materials.new(name=asset_id)
+                mat.use_nodes = True # Fix #8: Add use_nodes=True safety check
+                nodes = mat.node_tree.nodes
+                links = mat.node_tree.links
+
+                # Clear default nodes
+                for node in nodes:
+                    nodes.remove(node)
+
+                # Create output node
+                output = nodes.new(type='ShaderNodeOutputMaterial')
+                output.location = (300, 0)
+
+                # Create principled BSDF node
+                principled = nodes.new(type='ShaderNodeBsdfPrincipled')
+                principled.location = (0, 0)
+                links.new(principled.outputs[0], output.inputs[0])
+
+                # Add texture nodes based on available maps
+                tex_coord = nodes.new(type='ShaderNodeTexCoord')
+                tex_coord.location = (-800, 0)
+
+                mapping = nodes.new(type='ShaderNodeMapping')
+                mapping.location = (-600, 0)
+                mapping.vector_type = 'TEXTURE'  # Changed from default 'POINT' to 'TEXTURE'
+                links.new(tex_coord.outputs['UV'], mapping.inputs['Vector'])
+
+                # Position offset for texture nodes
+                x_pos = -400
+                y_pos = 300
+
+                # Connect different texture maps
+                for map_type, image in downloaded_maps.items():
+                    tex_node = nodes.new(type='ShaderNodeTexImage')
+                    tex_node.location = (x_pos, y_pos)
+                    tex_node.image = image
+
+                    # Set color space based on map type
+                    if map_type.lower() in ['color', 'diffuse', 'albedo']:
+                        try:
+                            tex_node.image.colorspace_settings.name = 'sRGB'
+                        except:
+                            pass  # Use default if sRGB not available
+                    else:
+                        try:
+                            tex_node.image.colorspace_settings.name = 'Non-Color'
+                        except:
+                            pass  # Use default if Non-Color not available
+
+                    links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
 
-            elif asset_type == "models":
-                # For models, prefer glTF format if available
-                if not file_format:
-                    file_format = "gltf"  # Default format for models
+                    # Connect to appropriate input on Principled BSDF
+                    if map_type.lower() in ['color', 'diffuse', 'albedo']:
+                        links.new(tex_node.outputs['Color'], principled.inputs['Base Color'])
+                    elif map_type.lower() in ['roughness', 'rough']:
+                        links.new(tex_node.outputs['Color'], principled.inputs['Roughness'])
+                    elif map_type.lower() in ['metallic', 'metalness', 'metal']:
+                        links.new(tex_node.outputs['Color'], principled.inputs['Metallic'])
+                    elif map_type.lower() in ['normal', 'nor']:
+                        # Add normal map node
+                        normal_map = nodes.new(type='ShaderNodeNormalMap')
+                        normal_map.location = (x_pos + 200, y_pos)
+                        links.new(tex_node.outputs['Color'], normal_map.inputs['Color'])
+                        links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
+                    elif map_type in ['displacement', 'disp', 'height']:
+                        # Add displacement node
+                        disp_node = nodes.new(type='ShaderNodeDisplacement')
+                        disp_node.location = (x_pos + 200, y_pos - 200)
+                        links.new(tex_node.outputs['Color'], disp_node.inputs['Height'])
+                        links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
+
+                    y_pos -= 250
 
-                if file_format in files_data and resolution in files_data[file_format]:
-                    file_info = files_data[file_format][resolution][file_format]
-                    file_url = file_info["url"]
+                return {
+                    "success": True,
+                    "message": f"Texture {asset_id} imported as material",
+                    "material": mat.name,
+                    "maps": list(downloaded_maps.keys())
+                }
 
-                    # Create a temporary directory to store the model and its dependencies
-                    temp_dir = tempfile.mkdtemp()
-                    main_file_path = ""
+            except Exception as e:
+                return {"error": f"Failed to process textures: {str(e)}"}
 
-                    try:
-                        # Download the main model file
-                        main_file_name = file_url.split("/")[-1]
-                        main_file_path = os.path.join(temp_dir, main_file_name)
-
-                        response = requests.get(file_url, headers=REQ_HEADERS)
-                        if response.status_code != 200:
-                            return {"error": f"Failed to download model: {response.status_code}"}
-
-                        with open(main_file_path, "wb") as f:
-                            f.write(response.content)
-
-                        # Check for included files and download them
-                        if "include" in file_info and file_info["include"]:
-                            for include_path, include_info in file_info["include"].items():
-                                # Get the URL for the included file - this is the fix
-                                include_url = include_info["url"]
-
-                                # Create the directory structure for the included file
-                                include_file_path = os.path.join(temp_dir, include_path)
-                                os.makedirs(os.path.dirname(include_file_path), exist_ok=True)
-
-                                # Download the included file
-                                include_response = requests.get(include_url, headers=REQ_HEADERS)
-                                if include_response.status_code == 200:
-                                    with open(include_file_path, "wb") as f:
-                                        f.write(include_response.content)
-                                else:
-                                    print(f"Failed to download included file: {include_path}")
-
-                        # Import the model into Blender
-                        if file_format == "gltf" or file_format == "glb":
-                            bpy.ops.import_scene.gltf(filepath=main_file_path)
-                        elif file_format == "fbx":
-                            bpy.ops.import_scene.fbx(filepath=main_file_path)
-                        elif file_format == "obj":
-                            bpy.ops.import_scene.obj(filepath=main_file_path)
-                        elif file_format == "blend":
-                            # For blend files, we need to append or link
-                            with bpy.data.libraries.load(main_file_path, link=False) as (data_from, data_to):
-                                data_to.objects = data_from.objects
-
-                            # Link the objects to the scene
-                            for obj in data_to.objects:
-                                if obj is not None:
-                                    bpy.context.collection.objects.link(obj)
-                        else:
-                            return {"error": f"Unsupported model format: {file_format}"}
-
-                        # Get the names of imported objects
-                        imported_objects = [obj.name for obj in bpy.context.selected_objects]
-
-                        return {
-                            "success": True,
-                            "message": f"Model {asset_id} imported successfully",
-                            "imported_objects": imported_objects
-                        }
-                    except Exception as e:
-                        return {"error": f"Failed to import model: {str(e)}"}
-                    finally:
-                        # Clean up temporary directory
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
+        else:
+            main_file_path = files["main"]
+            try:
+                # Import the model into Blender
+                if file_format == "gltf" or file_format == "glb":
+                    bpy.ops.import_scene.gltf(filepath=main_file_path)
+                elif file_format == "fbx":
+                    bpy.ops.import_scene.fbx(filepath=main_file_path)
+                elif file_format == "obj":
+                    bpy.ops.import_scene.obj(filepath=main_file_path)
+                elif file_format == "blend":
+                    # For blend files, we need to append or link
+                    with bpy.data.libraries.load(main_file_path, link=False) as (data_from, data_to):
+                        data_to.objects = data_from.objects
+
+                    # Link the objects to the scene
+                    for obj in data_to.objects:
+                        if obj is not None:
+                            bpy.context.collection.objects.link(obj)
                 else:
-                    return {"error": f"Requested format or resolution not available for this model"}
+                    return {"error": f"Unsupported model format: {file_format}"}
 
-            else:
-                return {"error": f"Unsupported asset type: {asset_type}"}
+                # Get the names of imported objects
+                imported_objects = [obj.name for obj in bpy.context.selected_objects]
 
-        except Exception as e:
-            return {"error": f"Failed to download asset: {str(e)}"}
+                return {
+                    "success": True,
+                    "message": f"Model {asset_id} imported successfully",
+                    "imported_objects": imported_objects
+                }
+            except Exception as e:
+                return {"error": f"Failed to import model: {str(e)}"}
 
     def set_texture(self, object_name, texture_id):
         """Apply a previously downloaded Polyhaven texture to an object by creating a new material"""
@@ -1813,13 +4785,9 @@ class BlenderMCPServer:
                         img.pack()
 
                     texture_images[map_type] = img
-                    print(f"Loaded texture map: {map_type} - {img.name}")
-
-                    # Debug info
-                    print(f"Image size: {img.size[0]}x{img.size[1]}")
-                    print(f"Color space: {img.colorspace_settings.name}")
-                    print(f"File format: {img.file_format}")
-                    print(f"Is packed: {bool(img.packed_file)}")
+                    logger.debug("Loaded texture map: %s - %s (%dx%d, %s, %s, packed=%s)",
+                                 map_type, img.name, img.size[0], img.size[1],
+                                 img.colorspace_settings.name, img.file_format, bool(img.packed_file))
 
             if not texture_images:
                 return {"error": f"No texture images found for: {texture_id}. Please download the texture first."}
@@ -1925,12 +4893,12 @@ class BlenderMCPServer:
                 # Connect Roughness (G) if no dedicated roughness map
                 if not any(mn in texture_nodes for mn in ['roughness', 'rough']):
                     links.new(separate_rgb.outputs[1], principled.inputs['Roughness'])
-                    print("Connected ARM.G to Roughness")
+                    logger.debug("Connected ARM.G to Roughness")
 
                 # Connect Metallic (B) if no dedicated metallic map
                 if not any(mn in texture_nodes for mn in ['metallic', 'metalness', 'metal']):
                     links.new(separate_rgb.outputs[2], principled.inputs['Metallic'])
-                    print("Connected ARM.B to Metallic")
+                    logger.debug("Connected ARM.B to Metallic")
 
                 # For AO (R channel), multiply with base color if we have one
                 base_color_node = None
@@ -1954,7 +4922,7 @@ class BlenderMCPServer:
                     links.new(base_color_node.outputs['Color'], mix_node.inputs[6])  # A input
                     links.new(separate_rgb.outputs[0], mix_node.inputs[7])  # B input
                     links.new(mix_node.outputs[2], principled.inputs['Base Color'])  # Result
-                    print("Connected ARM.R to AO mix with Base Color")
+                    logger.debug("Connected ARM.R to AO mix with Base Color")
 
             # Handle AO (Ambient Occlusion) if separate
             if 'ao' in texture_nodes:
@@ -1978,7 +4946,7 @@ class BlenderMCPServer:
                     links.new(base_color_node.outputs['Color'], mix_node.inputs[6])
                     links.new(texture_nodes['ao'].outputs['Color'], mix_node.inputs[7])
                     links.new(mix_node.outputs[2], principled.inputs['Base Color'])
-                    print("Connected AO to mix with Base Color")
+                    logger.debug("Connected AO to mix with Base Color")
 
             # CRITICAL: Make sure to clear all existing materials from the object
             while len(obj.data.materials) > 0:
@@ -2028,13 +4996,12 @@ class BlenderMCPServer:
             }
 
         except Exception as e:
-            print(f"Error in set_texture: {str(e)}")
-            traceback.print_exc()
+            logger.exception("Error in set_texture: %s", e)
             return {"error": f"Failed to apply texture: {str(e)}"}
 
     def get_polyhaven_status(self):
         """Get the current status of PolyHaven integration"""
-        enabled = bpy.context.scene.blendermcp_use_polyhaven
+        enabled = self.settings["use_polyhaven"]
         if enabled:
             return {"enabled": True, "message": "PolyHaven integration is enabled and ready to use."}
         else:
@@ -2049,9 +5016,11 @@ class BlenderMCPServer:
     #region Hyper3D
     def get_hyper3d_status(self):
         """Get the current status of Hyper3D Rodin integration"""
-        enabled = bpy.context.scene.blendermcp_use_hyper3d
+        # Read from the settings snapshot: this runs on the I/O thread
+        settings = self.settings
+        enabled = settings["use_hyper3d"]
         if enabled:
-            if not bpy.context.scene.blendermcp_hyper3d_api_key:
+            if not settings["hyper3d_api_key"]:
                 return {
                     "enabled": False,
                     "message": """Hyper3D Rodin integration is currently enabled, but API key is not given. To enable it:
@@ -2060,9 +5029,9 @@ class BlenderMCPServer:
                                 3. Choose the right plaform and fill in the API Key
                                 4. Restart the connection to Claude"""
                 }
-            mode = bpy.context.scene.blendermcp_hyper3d_mode
+            mode = settings["hyper3d_mode"]
             message = f"Hyper3D Rodin integration is enabled and ready to use. Mode: {mode}. " + \
-                f"Key type: {'private' if bpy.context.scene.blendermcp_hyper3d_api_key != RODIN_FREE_TRIAL_KEY else 'free_trial'}"
+                f"Key type: {'private' if settings['hyper3d_api_key'] != RODIN_FREE_TRIAL_KEY else 'free_trial'}"
             return {
                 "enabled": True,
                 "message": message
@@ -2197,7 +5166,7 @@ class BlenderMCPServer:
         # imported_objects = [obj for obj in bpy.context.view_layer.objects if obj.select_get()]
 
         if not imported_objects:
-            print("Error: No objects were imported.")
+            logger.error("No objects were imported.")
             return
 
         # Identify the mesh object
@@ -2205,35 +5174,35 @@ class BlenderMCPServer:
 
         if len(imported_objects) == 1 and imported_objects[0].type == 'MESH':
             mesh_obj = imported_objects[0]
-            print("Single mesh imported, no cleanup needed.")
+            logger.debug("Single mesh imported, no cleanup needed.")
         else:
             if len(imported_objects) == 2:
                 empty_objs = [i for i in imported_objects if i.type == "EMPTY"]
                 if len(empty_objs) != 1:
-                    print("Error: Expected an empty node with one mesh child or a single mesh object.")
+                    logger.error("Expected an empty node with one mesh child or a single mesh object.")
                     return
                 parent_obj = empty_objs.pop()
                 if len(parent_obj.children) == 1:
                     potential_mesh = parent_obj.children[0]
                     if potential_mesh.type == 'MESH':
-                        print("GLB structure confirmed: Empty node with one mesh child.")
+                        logger.debug("GLB structure confirmed: Empty node with one mesh child.")
 
                         # Unparent the mesh from the empty node
                         potential_mesh.parent = None
 
                         # Remove the empty node
                         bpy.data.objects.remove(parent_obj)
-                        print("Removed empty node, keeping only the mesh.")
+                        logger.debug("Removed empty node, keeping only the mesh.")
 
                         mesh_obj = potential_mesh
                     else:
-                        print("Error: Child is not a mesh object.")
+                        logger.error("Child is not a mesh object.")
                         return
                 else:
-                    print("Error: Expected an empty node with one mesh child or a single mesh object.")
+                    logger.error("Expected an empty node with one mesh child or a single mesh object.")
                     return
             else:
-                print("Error: Expected an empty node with one mesh child or a single mesh object.")
+                logger.error("Expected an empty node with one mesh child or a single mesh object.")
                 return
 
         # Rename the mesh if needed
@@ -2242,133 +5211,94 @@ class BlenderMCPServer:
                 mesh_obj.name = mesh_name
                 if mesh_obj.data.name is not None:
                     mesh_obj.data.name = mesh_name
-                print(f"Mesh renamed to: {mesh_name}")
+                logger.debug("Mesh renamed to: %s", mesh_name)
         except Exception as e:
-            print("Having issue with renaming, give up renaming.")
+            logger.warning("Having issue with renaming, give up renaming.")
 
         return mesh_obj
 
-    def import_generated_asset(self, *args, **kwargs):
+    def import_generated_asset(self, *args, as_job=False, notify=False, **kwargs):
+        """Import a finished Rodin generation; with as_job=True the download runs on a worker thread"""
         match bpy.context.scene.blendermcp_hyper3d_mode:
             case "MAIN_SITE":
-                return self.import_generated_asset_main_site(*args, **kwargs)
+                fetch_asset = self._fetch_generated_asset_main_site
             case "FAL_AI":
-                return self.import_generated_asset_fal_ai(*args, **kwargs)
+                fetch_asset = self._fetch_generated_asset_fal_ai
             case _:
                 return f"Error: Unknown Hyper3D Rodin mode!"
 
+        def fetch(job):
+            return fetch_asset(job, *args, **kwargs)
+
+        if as_job:
+            return self._start_job("import_generated_asset", fetch, self._import_generated_glb, notify)
+        return self._run_phases(fetch, self._import_generated_glb)
+
     def import_generated_asset_main_site(self, task_uuid: str, name: str):
         """Fetch the generated asset, import into blender"""
+        return self._run_phases(
+            lambda job: self._fetch_generated_asset_main_site(job, task_uuid, name),
+            self._import_generated_glb,
+        )
+
+    def import_generated_asset_fal_ai(self, request_id: str, name: str):
+        """Fetch the generated asset, import into blender"""
+        return self._run_phases(
+            lambda job: self._fetch_generated_asset_fal_ai(job, request_id, name),
+            self._import_generated_glb,
+        )
+
+    def _fetch_generated_asset_main_site(self, job, task_uuid: str, name: str):
+        """Network phase: look up and download the generated GLB from hyper3d.ai"""
         response = requests.post(
             "https://hyperhuman.deemos.com/api/v2/download",
             headers={
-                "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                "Authorization": f"Bearer {self.settings['hyper3d_api_key']}",
             },
             json={
                 'task_uuid': task_uuid
             }
         )
         data_ = response.json()
-        temp_file = None
         for i in data_["list"]:
             if i["name"].endswith(".glb"):
-                temp_file = tempfile.NamedTemporaryFile(
-                    delete=False,
-                    prefix=task_uuid,
-                    suffix=".glb",
-                )
-
-                try:
-                    # Download the content
-                    response = requests.get(i["url"], stream=True)
-                    response.raise_for_status()  # Raise an exception for HTTP errors
-
-                    # Write the content to the temporary file
-                    for chunk in response.iter_content(chunk_size=8192):
-                        temp_file.write(chunk)
-
-                    # Close the file
-                    temp_file.close()
-
-                except Exception as e:
-                    # Clean up the file if there's an error
-                    temp_file.close()
-                    os.unlink(temp_file.name)
-                    return {"succeed": False, "error": str(e)}
-
-                break
-        else:
-            return {"succeed": False, "error": "Generation failed. Please first make sure that all jobs of the task are done and then try again later."}
-
-        try:
-            obj = self._clean_imported_glb(
-                filepath=temp_file.name,
-                mesh_name=name
-            )
-            result = {
-                "name": obj.name,
-                "type": obj.type,
-                "location": [obj.location.x, obj.location.y, obj.location.z],
-                "rotation": [obj.rotation_euler.x, obj.rotation_euler.y, obj.rotation_euler.z],
-                "scale": [obj.scale.x, obj.scale.y, obj.scale.z],
-            }
-
-            if obj.type == "MESH":
-                bounding_box = self._get_aabb(obj)
-                result["world_bounding_box"] = bounding_box
-
-            return {
-                "succeed": True, **result
-            }
-        except Exception as e:
-            return {"succeed": False, "error": str(e)}
-        finally:
-            # Clean up temp file
-            try:
-                if temp_file and os.path.isfile(temp_file.name):
-                    os.unlink(temp_file.name)
-            except OSError:
-                pass
+                return self._fetch_generated_glb(job, i["url"], task_uuid, name)
+        return {"succeed": False, "error": "Generation failed. Please first make sure that all jobs of the task are done and then try again later."}
 
-    def import_generated_asset_fal_ai(self, request_id: str, name: str):
-        """Fetch the generated asset, import into blender"""
+    def _fetch_generated_asset_fal_ai(self, job, request_id: str, name: str):
+        """Network phase: look up and download the generated GLB from fal.ai"""
         response = requests.get(
             f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}",
             headers={
-                "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                "Authorization": f"Key {self.settings['hyper3d_api_key']}",
             }
         )
         data_ = response.json()
-        temp_file = None
-
-        temp_file = tempfile.NamedTemporaryFile(
-            delete=False,
-            prefix=request_id,
-            suffix=".glb",
-        )
+        return self._fetch_generated_glb(job, data_["model_mesh"]["url"], request_id, name)
 
+    @staticmethod
+    def _fetch_generated_glb(job, url, prefix, name):
+        temp_dir = tempfile.mkdtemp(prefix="modelforge-rodin-")
+        path = os.path.join(temp_dir, f"{prefix}.glb")
         try:
-            # Download the content
-            response = requests.get(data_["model_mesh"]["url"], stream=True)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-
-            # Write the content to the temporary file
-            for chunk in response.iter_content(chunk_size=8192):
-                temp_file.write(chunk)
-
-            # Close the file
-            temp_file.close()
-
+            status = _download_file(url, path, job)
         except Exception as e:
             # Clean up the file if there's an error
-            temp_file.close()
-            os.unlink(temp_file.name)
+            with suppress(Exception):
+                shutil.rmtree(temp_dir)
+            if isinstance(e, JobCancelled):
+                raise
             return {"succeed": False, "error": str(e)}
+        if status != 200:
+            return {"succeed": False, "error": f"Download failed with status code {status}", "temp_dir": temp_dir}
+        return {"temp_dir": temp_dir, "path": path, "name": name}
 
+    def _import_generated_glb(self, job, fetched):
+        """Main-thread phase: import the downloaded GLB as a single named mesh"""
         try:
             obj = self._clean_imported_glb(
-                filepath=temp_file.name,
-                mesh_name=name
+                filepath=fetched["path"],
+                mesh_name=fetched["name"]
             )
             result = {
                 "name": obj.name,
@@ -2387,13 +5317,6 @@ class BlenderMCPServer:
             }
         except Exception as e:
             return {"succeed": False, "error": str(e)}
-        finally:
-            # Clean up temp file
-            try:
-                if temp_file and os.path.isfile(temp_file.name):
-                    os.unlink(temp_file.name)
-            except OSError:
-                pass
     #endregion
 
     #region Sketchfab API
@@ -2517,129 +5440,134 @@ class BlenderMCPServer:
         except json.JSONDecodeError as e:
             return {"error": f"Invalid JSON response from Sketchfab API: {str(e)}"}
         except Exception as e:
-            import traceback
-            traceback.print_exc()
+            logger.exception("Sketchfab request failed: %s", e)
             return {"error": str(e)}
 
-    def download_sketchfab_model(self, uid):
-        """Download a model from Sketchfab by its UID"""
-        try:
-            api_key = bpy.context.scene.blendermcp_sketchfab_api_key
-            if not api_key:
-                return {"error": "Sketchfab API key is not configured"}
-
-            # Use proper authorization header for API key auth
-            headers = {
-                "Authorization": f"Token {api_key}"
-            }
-
-            # Request download URL using the exact endpoint from the documentation
-            download_endpoint = f"https://api.sketchfab.com/v3/models/{uid}/download"
-
-            response = requests.get(
-                download_endpoint,
-                headers=headers,
-                timeout=30  # Add timeout of 30 seconds
-            )
-
-            if response.status_code == 401:
-                return {"error": "Authentication failed (401). Check your API key."}
+    def download_sketchfab_model(self, uid, as_job=False, notify=False):
+        """Download a model from Sketchfab by its UID.
 
-            if response.status_code != 200:
-                return {"error": f"Download request failed with status code {response.status_code}"}
+        With as_job=True the download and unzip run on a worker thread and a
+        job handle is returned; only the glTF import runs on the main thread.
+        """
+        def fetch(job):
+            return self._fetch_sketchfab_model(job, uid)
 
-            data = response.json()
+        if as_job:
+            return self._start_job("download_sketchfab_model", fetch, self._import_sketchfab_model, notify)
+        try:
+            return self._run_phases(fetch, self._import_sketchfab_model)
+        except requests.exceptions.Timeout:
+            return {"error": "Request timed out. Check your internet connection and try again with a simpler model."}
+        except json.JSONDecodeError as e:
+            return {"error": f"Invalid JSON response from Sketchfab API: {str(e)}"}
+        except Exception as e:
+            logger.exception("Sketchfab request failed: %s", e)
+            return {"error": f"Failed to download model: {str(e)}"}
 
-            # Safety check for None data
-            if data is None:
-                return {"error": "Received empty response from Sketchfab API for download request"}
+    def _fetch_sketchfab_model(self, job, uid):
+        """Network phase: request the download URL, fetch the archive and unpack it"""
+        api_key = self.settings["sketchfab_api_key"]
+        if not api_key:
+            return {"error": "Sketchfab API key is not configured"}
 
-            # Extract download URL with safety checks
-            gltf_data = data.get("gltf")
-            if not gltf_data:
-                return {"error": "No gltf download URL available for this model. Response: " + str(data)}
+        # Use proper authorization header for API key auth
+        headers = {
+            "Authorization": f"Token {api_key}"
+        }
 
-            download_url = gltf_data.get("url")
-            if not download_url:
-                return {"error": "No download URL available for this model. Make sure the model is downloadable and you have access."}
+        # Request download URL using the exact endpoint from the documentation
+        download_endpoint = f"https://api.sketchfab.com/v3/models/{uid}/download"
 
-            # Download the model (already has timeout)
-            model_response = requests.get(download_url, timeout=60)  # 60 second timeout
+        response = requests.get(
+            download_endpoint,
+            headers=headers,
+            timeout=30  # Add timeout of 30 seconds
+        )
 
-            if model_response.status_code != 200:
-                return {"error": f"Model download failed with status code {model_response.status_code}"}
+        if response.status_code == 401:
+            return {"error": "Authentication failed (401). Check your API key."}
 
-            # Save to temporary file
-            temp_dir = tempfile.mkdtemp()
-            zip_file_path = os.path.join(temp_dir, f"{uid}.zip")
+        if response.status_code != 200:
+            return {"error": f"Download request failed with status code {response.status_code}"}
 
-            with open(zip_file_path, "wb") as f:
-                f.write(model_response.content)
+        data = response.json()
 
-            # Extract the zip file with enhanced security
-            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                # More secure zip slip prevention
-                for file_info in zip_ref.infolist():
-                    # Get the path of the file
-                    file_path = file_info.filename
+        # Safety check for None data
+        if data is None:
+            return {"error": "Received empty response from Sketchfab API for download request"}
+
+        # Extract download URL with safety checks
+        gltf_data = data.get("gltf")
+        if not gltf_data:
+            return {"error": "No gltf download URL available for this model. Response: " + str(data)}
+
+        download_url = gltf_data.get("url")
+        if not download_url:
+            return {"error": "No download URL available for this model. Make sure the model is downloadable and you have access."}
+        # Save to temporary file
+        temp_dir = tempfile.mkdtemp()
+        zip_file_path = os.path.join(temp_dir, f"{uid}.zip")
+        try:
+            status = _download_file(download_url, zip_file_path, job, timeout=60)  # 60 second timeout
+        except BaseException:
+            with suppress(Exception):
+                shutil.rmtree(temp_dir)
+            raise
 
-                    # Convert directory separators to the current OS style
-                    # This handles both / and \ in zip entries
-                    target_path = os.path.join(temp_dir, os.path.normpath(file_path))
+        if status != 200:
+            return {"error": f"Model download failed with status code {status}", "temp_dir": temp_dir}
 
-                    # Get absolute paths for comparison
-                    abs_temp_dir = os.path.abspath(temp_dir)
-                    abs_target_path = os.path.abspath(target_path)
+        # Extract the zip file with enhanced security
+        with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
+            # More secure zip slip prevention
+            for file_info in zip_ref.infolist():
+                # Get the path of the file
+                file_path = file_info.filename
 
-                    # Ensure the normalized path doesn't escape the target directory
-                    if not abs_target_path.startswith(abs_temp_dir):
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                        return {"error": "Security issue: Zip contains files with path traversal attempt"}
+                # Convert directory separators to the current OS style
+                # This handles both / and \ in zip entries
+                target_path = os.path.join(temp_dir, os.path.normpath(file_path))
 
-                    # Additional explicit check for directory traversal
-                    if ".." in file_path:
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                        return {"error": "Security issue: Zip contains files with directory traversal sequence"}
+                # Get absolute paths for comparison
+                abs_temp_dir = os.path.abspath(temp_dir)
+                abs_target_path = os.path.abspath(target_path)
 
-                # If all files passed security checks, extract them
-                zip_ref.extractall(temp_dir)
+                # Ensure the normalized path doesn't escape the target directory
+                if not abs_target_path.startswith(abs_temp_dir):
+                    return {"error": "Security issue: Zip contains files with path traversal attempt",
+                            "temp_dir": temp_dir}
 
-            # Find the main glTF file
-            gltf_files = [f for f in os.listdir(temp_dir) if f.endswith('.gltf') or f.endswith('.glb')]
+                # Additional explicit check for directory traversal
+                if ".." in file_path:
+                    return {"error": "Security issue: Zip contains files with directory traversal sequence",
+                            "temp_dir": temp_dir}
 
-            if not gltf_files:
-                with suppress(Exception):
-                    shutil.rmtree(temp_dir)
-                return {"error": "No glTF file found in the downloaded model"}
+            # If all files passed security checks, extract them
+            zip_ref.extractall(temp_dir)
 
-            main_file = os.path.join(temp_dir, gltf_files[0])
+        # Find the main glTF file
+        gltf_files = [f for f in os.listdir(temp_dir) if f.endswith('.gltf') or f.endswith('.glb')]
 
-            # Import the model
-            bpy.ops.import_scene.gltf(filepath=main_file)
+        if not gltf_files:
+            return {"error": "No glTF file found in the downloaded model", "temp_dir": temp_dir}
 
-            # Get the names of imported objects
-            imported_objects = [obj.name for obj in bpy.context.selected_objects]
+        main_file = os.path.join(temp_dir, gltf_files[0])
+        return {"temp_dir": temp_dir, "main_file": main_file}
 
-            # Clean up temporary files
-            with suppress(Exception):
-                shutil.rmtree(temp_dir)
+    @staticmethod
+    def _import_sketchfab_model(job, fetched):
+        """Main-thread phase: import the unpacked glTF"""
+        # Import the model
+        bpy.ops.import_scene.gltf(filepath=fetched["main_file"])
 
-            return {
-                "success": True,
-                "message": "Model imported successfully",
-                "imported_objects": imported_objects
-            }
+        # Get the names of imported objects
+        imported_objects = [obj.name for obj in bpy.context.selected_objects]
 
-        except requests.exceptions.Timeout:
-            return {"error": "Request timed out. Check your internet connection and try again with a simpler model."}
-        except json.JSONDecodeError as e:
-            return {"error": f"Invalid JSON response from Sketchfab API: {str(e)}"}
-        except Exception as e:
-            import traceback
-            traceback.print_exc()
-            return {"error": f"Failed to download model: {str(e)}"}
+        return {
+            "success": True,
+            "message": "Model imported successfully",
+            "imported_objects": imported_objects
+        }
     #endregion
 
 # Blender UI Panel
@@ -2680,12 +5608,28 @@ class MODELFORGE_PT_Panel(bpy.types.Panel):
             layout.operator("modelforge.stop_server", text="Disconnect", icon='PAUSE')
             layout.label(text=f"Port: {scene.blendermcp_port}")
 
+            # Per-command latency (handler p50 / p95) for the busiest commands
+            server = bpy.types.blendermcp_server
+            commands = server.stats.summary()
+            box = layout.box()
+            box.label(text="Performance", icon='TIME')
+            box.label(text=f"Commands: {sum(c['calls'] for c in commands.values())}  "
+                           f"Queued: {server.work_queue.qsize()}")
+            busiest = sorted(commands.items(), key=lambda item: item[1]["calls"], reverse=True)[:5]
+            for cmd_type, entry in busiest:
+                handler = entry.get("handler")
+                if handler:
+                    box.label(text=f"{cmd_type}: {handler['p50_ms']:.1f} / {handler['p95_ms']:.1f} ms")
+
         layout.separator()
 
         # Settings section
         box = layout.box()
         box.label(text="Settings", icon='PREFERENCES')
         box.prop(scene, "blendermcp_port", text="Port")
+        box.prop(scene, "blendermcp_max_clients", text="Max Clients")
+        box.prop(scene, "blendermcp_log_level", text="Log Level")
+        box.prop(scene, "blendermcp_orphan_purge", text="Purge Orphans")
 
         layout.separator()
 
@@ -2693,6 +5637,8 @@ class MODELFORGE_PT_Panel(bpy.types.Panel):
         box = layout.box()
         box.label(text="Asset Sources", icon='ASSET_MANAGER')
         box.prop(scene, "blendermcp_use_polyhaven", text="Poly Haven")
+        if scene.blendermcp_use_polyhaven:
+            box.prop(scene, "blendermcp_asset_cache_mb", text="Download Cache (MB)")
 
         box.prop(scene, "blendermcp_use_hyper3d", text="Hyper3D Rodin")
         if scene.blendermcp_use_hyper3d:
@@ -2728,7 +5674,10 @@ class MODELFORGE_OT_StartServer(bpy.types.Operator):
 
         # Create a new server instance
         if not hasattr(bpy.types, "blendermcp_server") or not bpy.types.blendermcp_server:
-            bpy.types.blendermcp_server = BlenderMCPServer(port=scene.blendermcp_port)
+            bpy.types.blendermcp_server = BlenderMCPServer(
+                port=scene.blendermcp_port,
+                max_clients=scene.blendermcp_max_clients,
+            )
 
         # Start the server
         bpy.types.blendermcp_server.start()
@@ -2754,6 +5703,16 @@ class MODELFORGE_OT_StopServer(bpy.types.Operator):
 
         return {'FINISHED'}
 
+def _update_log_level(scene, context):
+    """Property update callback: apply the chosen log level to the addon logger"""
+    logger.setLevel(scene.blendermcp_log_level)
+
+def _refresh_server_handlers(scene, context):
+    """Property update callback: rebuild the command registry and settings snapshot"""
+    server = getattr(bpy.types, "blendermcp_server", None)
+    if server is not None:
+        server.refresh_handlers(scene)
+
 @bpy.app.handlers.persistent
 def _sync_server_status(_dummy=None):
     """Re-sync blendermcp_server_running after file load (File → New / Open)"""
@@ -2764,6 +5723,47 @@ def _sync_server_status(_dummy=None):
     )
     for scene in bpy.data.scenes:
         scene.blendermcp_server_running = actually_running
+    # Log level is stored per file
+    logger.setLevel(bpy.context.scene.blendermcp_log_level)
+    # The loaded file may carry different integration toggles
+    if actually_running:
+        bpy.types.blendermcp_server.refresh_handlers()
+        bpy.types.blendermcp_server.scene_tracker.reset(bpy.context.scene)
+
+@bpy.app.handlers.persistent
+def _track_depsgraph_update(scene, depsgraph):
+    """Feed object changes to the running server's scene tracker"""
+    server = getattr(bpy.types, "blendermcp_server", None)
+    if server is not None and server.running:
+        server.scene_tracker.on_depsgraph_update(scene, depsgraph)
+
+@bpy.app.handlers.persistent
+def _track_frame_change(scene, depsgraph=None):
+    """Animated objects move on frame changes, which depsgraph_update_post doesn't report"""
+    server = getattr(bpy.types, "blendermcp_server", None)
+    if server is not None and server.running:
+        server.scene_tracker.on_frame_change(scene)
+
+@bpy.app.handlers.persistent
+def _reset_scene_tracker(*_args):
+    """Undo/redo reallocates datablocks, so tracked object pointers go stale"""
+    server = getattr(bpy.types, "blendermcp_server", None)
+    if server is not None and server.running:
+        server.scene_tracker.reset(bpy.context.scene)
+
+@bpy.app.handlers.persistent
+def _on_render_complete(*_args):
+    """Hand a finished modal render back to the job that started it"""
+    server = getattr(bpy.types, "blendermcp_server", None)
+    if server is not None:
+        server.jobs.render_finished(cancelled=False)
+
+@bpy.app.handlers.persistent
+def _on_render_cancel(*_args):
+    """The user pressed Esc on a render a job is waiting for"""
+    server = getattr(bpy.types, "blendermcp_server", None)
+    if server is not None:
+        server.jobs.render_finished(cancelled=True)
 
 
 # Registration functions
@@ -2776,21 +5776,60 @@ def register():
         max=65535
     )
 
+    bpy.types.Scene.blendermcp_max_clients = IntProperty(
+        name="Max Clients",
+        description="Maximum number of simultaneous client connections",
+        default=DEFAULT_MAX_CLIENTS,
+        min=1,
+        max=64
+    )
+
     bpy.types.Scene.blendermcp_server_running = bpy.props.BoolProperty(
         name="Server Running",
         default=False
     )
 
+    bpy.types.Scene.blendermcp_log_level = bpy.props.EnumProperty(
+        name="Log Level",
+        description="Minimum severity written to the console and the log buffer",
+        items=[(level, level.capitalize(), f"Log {level.lower()} messages and above")
+               for level in LOG_LEVELS],
+        default=DEFAULT_LOG_LEVEL,
+        update=_update_log_level
+    )
+
+    bpy.types.Scene.blendermcp_orphan_purge = bpy.props.EnumProperty(
+        name="Purge Orphans",
+        description="When to remove datablocks that have had no users for a couple of minutes",
+        items=[
+            ('OFF', "Off", "Keep orphan data until the file is saved and reopened"),
+            ('HEAVY', "After Heavy Commands", "After imports, downloads, renders and code runs"),
+            ('ALWAYS', "After Every Edit", "After every command that can modify the file"),
+        ],
+        default='OFF',
+        update=_refresh_server_handlers
+    )
+
     bpy.types.Scene.blendermcp_use_polyhaven = bpy.props.BoolProperty(
         name="Use Poly Haven",
         description="Enable Poly Haven asset integration",
-        default=False
+        default=False,
+        update=_refresh_server_handlers
+    )
+
+    bpy.types.Scene.blendermcp_asset_cache_mb = IntProperty(
+        name="Download Cache",
+        description="Disk space for cached Poly Haven downloads in MB; 0 disables the cache",
+        default=DEFAULT_ASSET_CACHE_MB,
+        min=0,
+        update=_refresh_server_handlers
     )
 
     bpy.types.Scene.blendermcp_use_hyper3d = bpy.props.BoolProperty(
         name="Use Hyper3D Rodin",
         description="Enable Hyper3D Rodin generation integration",
-        default=False
+        default=False,
+        update=_refresh_server_handlers
     )
 
     bpy.types.Scene.blendermcp_hyper3d_mode = bpy.props.EnumProperty(
@@ -2800,27 +5839,31 @@ def register():
             ("MAIN_SITE", "hyper3d.ai", "hyper3d.ai"),
             ("FAL_AI", "fal.ai", "fal.ai"),
         ],
-        default="MAIN_SITE"
+        default="MAIN_SITE",
+        update=_refresh_server_handlers
     )
 
     bpy.types.Scene.blendermcp_hyper3d_api_key = bpy.props.StringProperty(
         name="Hyper3D API Key",
         subtype="PASSWORD",
         description="API Key provided by Hyper3D",
-        default=""
+        default="",
+        update=_refresh_server_handlers
     )
 
     bpy.types.Scene.blendermcp_use_sketchfab = bpy.props.BoolProperty(
         name="Use Sketchfab",
         description="Enable Sketchfab asset integration",
-        default=False
+        default=False,
+        update=_refresh_server_handlers
     )
 
     bpy.types.Scene.blendermcp_sketchfab_api_key = bpy.props.StringProperty(
         name="Sketchfab API Key",
         subtype="PASSWORD",
         description="API Key provided by Sketchfab",
-        default=""
+        default="",
+        update=_refresh_server_handlers
     )
 
     bpy.utils.register_class(MODELFORGE_PT_Panel)
@@ -2830,8 +5873,16 @@ def register():
 
     # Re-sync server status after File → New / File → Open
     bpy.app.handlers.load_post.append(_sync_server_status)
+    # Scene change tracking for get_scene_delta
+    bpy.app.handlers.depsgraph_update_post.append(_track_depsgraph_update)
+    bpy.app.handlers.frame_change_post.append(_track_frame_change)
+    bpy.app.handlers.undo_post.append(_reset_scene_tracker)
+    bpy.app.handlers.redo_post.append(_reset_scene_tracker)
+    # Completion of render_image jobs
+    bpy.app.handlers.render_complete.append(_on_render_complete)
+    bpy.app.handlers.render_cancel.append(_on_render_cancel)
 
-    print("ModelForge Blender addon registered")
+    logger.info("ModelForge Blender addon registered")
 
 def unregister():
     # Stop the server if it's running
@@ -2846,12 +5897,23 @@ def unregister():
         except RuntimeError:
             pass
 
-    # Remove load_post handler
-    if _sync_server_status in bpy.app.handlers.load_post:
-        bpy.app.handlers.load_post.remove(_sync_server_status)
+    # Remove app handlers
+    for handler_list, handler in (
+        (bpy.app.handlers.load_post, _sync_server_status),
+        (bpy.app.handlers.depsgraph_update_post, _track_depsgraph_update),
+        (bpy.app.handlers.frame_change_post, _track_frame_change),
+        (bpy.app.handlers.undo_post, _reset_scene_tracker),
+        (bpy.app.handlers.redo_post, _reset_scene_tracker),
+        (bpy.app.handlers.render_complete, _on_render_complete),
+        (bpy.app.handlers.render_cancel, _on_render_cancel),
+    ):
+        if handler in handler_list:
+            handler_list.remove(handler)
 
     props = [
-        "blendermcp_port", "blendermcp_server_running", "blendermcp_use_polyhaven",
+        "blendermcp_port", "blendermcp_max_clients", "blendermcp_server_running", "blendermcp_log_level",
+        "blendermcp_orphan_purge",
+        "blendermcp_use_polyhaven", "blendermcp_asset_cache_mb",
         "blendermcp_use_hyper3d", "blendermcp_hyper3d_mode", "blendermcp_hyper3d_api_key",
         "blendermcp_use_sketchfab", "blendermcp_sketchfab_api_key",
     ]
@@ -2861,7 +5923,7 @@ def unregister():
         except AttributeError:
             pass
 
-    print("ModelForge Blender addon unregistered")
+    logger.info("ModelForge Blender addon unregistered")
 
 if __name__ == "__main__":
     register()
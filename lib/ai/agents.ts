@@ -98,17 +98,34 @@ const getSceneInfo = tool(
   }
 )
 
+const OBJECT_RECORD_FIELDS = [
+  "location", "rotation", "scale", "visible", "world_bounding_box",
+  "materials", "mesh", "modifiers", "light", "camera",
+] as const
+
 const getAllObjectInfo = tool(
-  async ({ max_objects, start_index }: { max_objects?: number; start_index?: number }) =>
-    executeMcpCommand("get_all_object_info", { max_objects, start_index }),
+  async (params: {
+    max_objects?: number
+    start_index?: number
+    fields?: string[]
+    types?: string[]
+    name_glob?: string
+    collection?: string
+  }) => executeMcpCommand("get_all_object_info", params),
   {
     name: "get_all_object_info",
     description:
       "Get detailed info for all objects in the scene with transforms, materials, mesh stats, " +
-      "modifiers, light/camera data. Supports pagination for large scenes.",
+      "modifiers, light/camera data. Supports pagination for large scenes. " +
+      "Request only the fields you need and filter by type, name or collection to keep results small.",
     schema: z.object({
       max_objects: z.number().optional().describe("Max objects to return (default 50)"),
       start_index: z.number().optional().describe("Start index for pagination (default 0)"),
+      fields: z.array(z.enum(OBJECT_RECORD_FIELDS)).optional()
+        .describe("Only include these fields (name and type are always returned)"),
+      types: z.array(z.string()).optional().describe("Object types to include, e.g. [\"MESH\", \"LIGHT\"]"),
+      name_glob: z.string().optional().describe("Shell-style name pattern, e.g. \"Chair*\""),
+      collection: z.string().optional().describe("Only objects in this collection (including child collections)"),
     }),
   }
 )
@@ -63,7 +63,7 @@ MCP TOOL REFERENCE (all available commands):
 ── READ-ONLY (no scene changes) ──────────────────────────────
 • get_scene_info — No params. Returns: object names, types, materials_count, lights, active camera. USE FIRST in every plan.
 • get_object_info — Params: {{"name": "ObjectName"}}. Returns: transforms, dimensions, materials, modifiers. Use to verify positions after creation.
-• get_all_object_info — Params: {{"max_objects": 50, "start_index": 0}}. Returns: paginated list of ALL objects. Use when editing to discover existing scene state.
+• get_all_object_info — Params: {{"max_objects": 50, "start_index": 0}}, optional {{"fields": ["location", "rotation", "scale"], "types": ["MESH"], "name_glob": "Chair*", "collection": "Props"}}. Returns: paginated list of ALL objects (or those matching the filters). Use when editing to discover existing scene state; request only the fields you need.
 • get_viewport_screenshot — Params: {{"max_size": 800, "format": "png"}} (all optional). Returns: base64 image of viewport. Use for visual verification. WARNING: Do NOT use 'width' or 'height' — they are not valid parameters.
 
 ── WRITE (modifies scene) ────────────────────────────────────
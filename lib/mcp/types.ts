@@ -18,9 +18,13 @@ export interface McpCommand {
   id?: string
   type: McpCommandType
   params?: Record<string, unknown>
+  /** Seconds from receipt; Blender drops the command if it hasn't started by then */
+  timeout?: number
 }
 
 export interface McpResponse<T = unknown> {
+  /** Echo of the originating command's id */
+  id?: string
   status?: "ok" | "success" | "error"
   result?: T
   message?: string
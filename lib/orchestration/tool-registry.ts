@@ -20,7 +20,8 @@ export const TOOL_REGISTRY: ToolMetadata[] = [
     description:
       "Retrieve detailed info for every object in the scene at once: transforms, materials, modifiers, mesh stats, light/camera data. Use instead of multiple get_object_info calls when you need the full picture.",
     category: "inspection",
-    parameters: "max_objects?: number (default 50), start_index?: number (default 0)",
+    parameters:
+      "max_objects?: number (default 50), start_index?: number (default 0), fields?: string[] (location|rotation|scale|visible|world_bounding_box|materials|mesh|modifiers|light|camera), types?: string[] (e.g. MESH, LIGHT), name_glob?: string, collection?: string",
   },
   {
     name: "get_viewport_screenshot",
@@ -118,6 +118,68 @@ async function test(
   }
 }
 
+// ── Interrupt tests ─────────────────────────────────────────────────────
+// One ndjson connection per test: cancel() only reaches commands sent on the
+// same connection, and replies are matched by id.
+async function interruptTest(
+  name: string,
+  code: string,
+  options: { timeout?: number; cancelAfterMs?: number }
+): Promise<boolean> {
+  const label = `${cyan("execute_code")} — ${name}`
+  const start = performance.now()
+  const detail = await new Promise<string | null>((resolve) => {
+    const socket = net.createConnection({ host: HOST, port: PORT })
+    let buffer = ""
+    let negotiated = false
+    const finish = (err: string | null) => {
+      clearTimeout(timer)
+      socket.destroy()
+      resolve(err)
+    }
+    const timer = setTimeout(() => finish("Snippet was not interrupted within 5s"), 5_000)
+
+    socket.on("connect", () => {
+      socket.write(JSON.stringify({ type: "negotiate_protocol", params: { framing: "ndjson" } }))
+    })
+    socket.on("data", (chunk: Buffer) => {
+      buffer += chunk.toString("utf8")
+      if (!negotiated) {
+        // The ack still uses legacy framing: one bare JSON object
+        negotiated = true
+        buffer = ""
+        const command: Record<string, unknown> = { id: "loop", type: "execute_code", params: { code } }
+        if (options.timeout !== undefined) command.timeout = options.timeout
+        socket.write(`${JSON.stringify(command)}\n`)
+        if (options.cancelAfterMs !== undefined) {
+          setTimeout(() => {
+            socket.write(`${JSON.stringify({ id: "cancel", type: "cancel", params: { request_id: "loop" } })}\n`)
+          }, options.cancelAfterMs)
+        }
+        return
+      }
+      let newline: number
+      while ((newline = buffer.indexOf("\n")) >= 0) {
+        const reply = JSON.parse(buffer.slice(0, newline)) as Record<string, unknown>
+        buffer = buffer.slice(newline + 1)
+        if (reply.id !== "loop") continue
+        const message = String(reply.message ?? "")
+        finish(reply.status === "error" && /cancelled|timed out/.test(message)
+          ? null
+          : `Unexpected reply: ${JSON.stringify(reply).slice(0, 200)}`)
+      }
+    })
+    socket.once("error", (err) => finish(err.message))
+  })
+
+  const duration = Math.round(performance.now() - start)
+  const passed = detail === null
+  console.log(`  ${passed ? green("✓") : red("✗")} ${label} ${dim(`(${duration}ms)`)}`)
+  if (!passed) console.log(`    ${red(detail)}`)
+  results.push({ name, tool: "execute_code", passed, duration, detail: detail ?? "interrupted" })
+  return passed
+}
+
 // ── Main ────────────────────────────────────────────────────────────────
 async function main() {
   console.log()
@@ -242,6 +304,15 @@ print(f"Added spotlight: {light.name}")
     return null
   })
 
+  // ── Phase 6: Interrupting execute_code ────────────────────────────
+  console.log()
+  console.log(yellow("▸ Phase 6: Interrupting execute_code"))
+
+  // Single-line loops jump back to their own line, which line tracing misses
+  await interruptTest("cancel a single-line loop", "while True: pass", { cancelAfterMs: 300 })
+  await interruptTest("cancel a loop body", "x = 0\nwhile True:\n    x += 1", { cancelAfterMs: 300 })
+  await interruptTest("time out a single-line loop", "while True: pass", { timeout: 0.3 })
+
   // ── Summary ───────────────────────────────────────────────────────
   console.log()
   console.log(bold("═══════════════════════════════════════════════"))